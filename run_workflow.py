@@ -6,29 +6,39 @@ Usage:
     python run_workflow.py "How do I create a project in Asana?"
     python run_workflow.py --demo
     python run_workflow.py --batch queries.txt
+    python run_workflow.py --batch queries.txt --parallel 4
+    python run_workflow.py --batch queries.txt --replay-skills
 """
 import sys
 import argparse
+from collections import Counter
 from pathlib import Path
-from src.workflow_engine import EnhancedWorkflowEngine
+from typing import Iterator
 
 
-def run_single_workflow(query: str, use_auth: bool = True, use_session: bool = False, headless: bool = False):
-    """Run a single workflow"""
+def run_single_workflow(query: str, use_auth: bool = True, use_session: bool = False, headless: bool = False, engine=None, use_skills: bool = False):
+    """Run a single workflow (reusing ``engine`` when one is passed in)"""
+    from src.workflow_engine import EnhancedWorkflowEngine
+    from src.log import flush as flush_log
+
+    flush_log()
     print(f"\n🚀 Running workflow: {query}")
 
     # Create engine
-    engine = EnhancedWorkflowEngine(
-        headless=headless,
-        max_steps=15,
-        use_auth=use_auth,
-        use_session=use_session
-    )
+    if engine is None:
+        engine = EnhancedWorkflowEngine(
+            headless=headless,
+            max_steps=15,
+            use_auth=use_auth,
+            use_session=use_session,
+            use_skills=use_skills
+        )
 
     # Execute workflow
     result = engine.execute_workflow(query)
 
-    # Print results
+    # Print results once the engine's queued log records are written
+    flush_log()
     print("\n" + "="*80)
     print("📊 WORKFLOW RESULTS")
     print("="*80)
@@ -50,39 +60,54 @@ def run_single_workflow(query: str, use_auth: bool = True, use_session: bool = F
     return result
 
 
-def run_batch_workflows(file_path: Path, use_auth: bool = True, use_session: bool = False, headless: bool = False):
+def _read_queries(file_path: Path) -> Iterator[str]:
+    """Yield non-blank, non-comment lines from a batch file"""
+    with open(file_path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
+
+
+def run_batch_workflows(file_path: Path, use_auth: bool = True, use_session: bool = False, headless: bool = False, parallel: int = 1, use_skills: bool = False):
     """Run multiple workflows from a file"""
+    from src.workflow_engine import EnhancedWorkflowEngine
+    from src.browser_pool import BrowserPool
+    from src.log import flush as flush_log
+
     if not file_path.exists():
         print(f"❌ File not found: {file_path}")
         return
 
-    with open(file_path, 'r') as f:
-        queries = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    queries = list(_read_queries(file_path))
 
     print(f"\n📋 Running {len(queries)} workflows from {file_path}")
 
-    engine = EnhancedWorkflowEngine(
-        headless=headless,
-        max_steps=15,
-        use_auth=use_auth,
-        use_session=use_session
-    )
+    # Sequential runs share one warm browser; parallel workers get their own
+    with BrowserPool(size=1, headless=headless) as pool:
+        engine = EnhancedWorkflowEngine(
+            headless=headless,
+            max_steps=15,
+            use_auth=use_auth,
+            use_session=use_session,
+            pool=pool,
+            use_skills=use_skills
+        )
 
-    results = engine.execute_batch(queries)
+        results = engine.execute_batch(queries, parallel=parallel)
 
-    # Summary
+    # Summary (after the workers' queued log records are written)
+    flush_log()
     print("\n" + "="*80)
     print("📊 BATCH EXECUTION SUMMARY")
     print("="*80)
 
-    successful = sum(1 for r in results if r['status'] == 'completed')
-    failed = sum(1 for r in results if r['status'] == 'failed')
-    max_steps = sum(1 for r in results if r['status'] == 'max_steps_reached')
+    status_counts = Counter(r['status'] for r in results)
 
     print(f"Total workflows: {len(results)}")
-    print(f"✅ Successful: {successful}")
-    print(f"❌ Failed: {failed}")
-    print(f"⚠️  Max steps reached: {max_steps}")
+    print(f"✅ Successful: {status_counts['completed']}")
+    print(f"❌ Failed: {status_counts['failed']}")
+    print(f"⚠️  Max steps reached: {status_counts['max_steps_reached']}")
 
     for i, result in enumerate(results, 1):
         status_icon = "✅" if result['status'] == 'completed' else "❌"
@@ -99,6 +124,10 @@ def run_batch_workflows(file_path: Path, use_auth: bool = True, use_session: boo
 
 def run_demo_workflows():
     """Run demonstration workflows"""
+    from src.workflow_engine import EnhancedWorkflowEngine
+    from src.browser_pool import BrowserPool
+    from src.log import flush as flush_log
+
     print("\n" + "="*80)
     print("🎭 RUNNING DEMONSTRATION WORKFLOWS")
     print("="*80 + "\n")
@@ -118,20 +147,25 @@ def run_demo_workflows():
 
     input("Press Enter to continue...")
 
-    engine = EnhancedWorkflowEngine(
-        headless=False,
-        max_steps=10,
-        use_auth=True
-    )
-
     results = []
-    for query in demo_queries:
-        try:
-            result = run_single_workflow(query, use_auth=True, headless=False)
-            results.append(result)
-        except Exception as e:
-            print(f"❌ Error: {e}")
-            results.append({'status': 'failed', 'error': str(e)})
+
+    # One engine and warm browser shared by every demo
+    with BrowserPool(size=1, headless=False) as pool:
+        engine = EnhancedWorkflowEngine(
+            headless=False,
+            max_steps=10,
+            use_auth=True,
+            pool=pool
+        )
+
+        for query in demo_queries:
+            try:
+                result = run_single_workflow(query, engine=engine)
+                results.append(result)
+            except Exception as e:
+                flush_log()
+                print(f"❌ Error: {e}")
+                results.append({'status': 'failed', 'error': str(e)})
 
     return results
 
@@ -177,6 +211,13 @@ def main():
         help='Run browser in headless mode'
     )
 
+    parser.add_argument(
+        '--parallel',
+        type=int,
+        default=1,
+        help='Number of batch workflows to run concurrently (default: 1)'
+    )
+
     parser.add_argument(
         '--max-steps',
         type=int,
@@ -184,6 +225,12 @@ def main():
         help='Maximum steps before stopping (default: 15)'
     )
 
+    parser.add_argument(
+        '--replay-skills',
+        action='store_true',
+        help='Replay recorded steps for tasks that succeeded before (skips the LLM and most screenshots)'
+    )
+
     args = parser.parse_args()
 
     # Validate arguments
@@ -200,14 +247,17 @@ def main():
             args.batch,
             use_auth=not args.no_auth,
             use_session=args.use_session,
-            headless=args.headless
+            headless=args.headless,
+            parallel=args.parallel,
+            use_skills=args.replay_skills
         )
     else:
         run_single_workflow(
             args.query,
             use_auth=not args.no_auth,
             use_session=args.use_session,
-            headless=args.headless
+            headless=args.headless,
+            use_skills=args.replay_skills
         )
 
 
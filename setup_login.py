@@ -12,6 +12,7 @@ Usage:
     python setup_login.py notion
     python setup_login.py --list
 """
+import os
 import sys
 import argparse
 from pathlib import Path
@@ -19,7 +20,6 @@ from pathlib import Path
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src.browser import PersistentBrowserAgent
 from src.config import APP_URLS
 
 
@@ -55,6 +55,10 @@ def setup_login_for_app(app: str):
 
     input("\nPress Enter to open browser...")
 
+    # Imported here so --help/--list don't pay for loading Playwright
+    from src.browser import PersistentBrowserAgent
+    from src.log import flush as flush_log
+
     # Create persistent browser (not headless for manual login)
     # The PersistentBrowserAgent automatically saves sessions!
     browser = PersistentBrowserAgent(
@@ -69,7 +73,9 @@ def setup_login_for_app(app: str):
             print(f"\n🌐 Navigating to {app_url}...")
             browser.goto(app_url)
 
-            # Wait for user to complete login
+            # Wait for user to complete login (prompt after the browser's
+            # queued log records so they don't land on the input line)
+            flush_log()
             print("\n⏳ Waiting for you to complete login...")
             print("   Take your time to:")
             print("   - Complete OAuth/SSO flow")
@@ -78,21 +84,37 @@ def setup_login_for_app(app: str):
 
             input("\n✅ Press Enter once you're logged in and the app has loaded...")
 
-            # Session is automatically saved by PersistentBrowserAgent
-            print("\n💾 Session automatically saved!")
-            print(f"   Session location: browser_sessions/{app}/")
+            # Save cookies + localStorage as portable JSON - workflows load
+            # this into fresh contexts instead of opening the full profile
+            state_path = browser.session_dir / "state.json"
+            browser.context.storage_state(path=str(state_path))
+            print("\n💾 Session saved!")
+            print(f"   Session location: {state_path}")
             print(f"\n✅ SUCCESS! You can now run workflows without manual login:")
             print(f"   python run_workflow.py \"How do I create a project in {app}?\" --use-session")
 
         return True
 
     except Exception as e:
+        flush_log()
         print(f"\n❌ Error during setup: {e}")
         import traceback
         traceback.print_exc()
         return False
 
 
+def _dir_size(path) -> int:
+    """Total size of files under a directory (DirEntry reuses the readdir stat)"""
+    total = 0
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False):
+                total += entry.stat(follow_symlinks=False).st_size
+            elif entry.is_dir(follow_symlinks=False):
+                total += _dir_size(entry.path)
+    return total
+
+
 def list_sessions():
     """List all saved sessions"""
     print("\n" + "=" * 80)
@@ -116,7 +138,7 @@ def list_sessions():
             print(f"\nFound {len(session_folders)} session(s):\n")
             for folder in session_folders:
                 # Calculate folder size
-                size = sum(f.stat().st_size for f in folder.rglob('*') if f.is_file())
+                size = _dir_size(folder)
                 size_mb = size / (1024 * 1024)
                 print(f"  ✅ {folder.name:<15} ({size_mb:.2f} MB)")
                 print(f"     Location: {folder}")
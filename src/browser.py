@@ -1,10 +1,408 @@
 """Browser agent with persistent session support - solves OAuth/Google login issues"""
-from playwright.sync_api import sync_playwright, Browser, Page, Playwright, BrowserContext
+from playwright.sync_api import sync_playwright, Browser, Page, Playwright, BrowserContext, ElementHandle
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Set, Tuple
+import atexit
+import os
+import re
+import threading
 import time
+import weakref
 from .state_detector import StateDetector
-from .config import HEADLESS, BROWSER_TIMEOUT, SCREENSHOTS_DIR
+from .config import HEADLESS, BROWSER_TIMEOUT, SCREENSHOTS_DIR, SCREENSHOT_JPEG_QUALITY, CHROMIUM_ARGS
+from .log import get_logger
+
+log = get_logger(__name__)
+
+
+# Resolves once the renderer has an idle slot (capped at 500ms)
+_IDLE_CALLBACK_JS = "() => new Promise(r => requestIdleCallback(() => r(), {timeout: 500}))"
+
+
+# Finds which lookup strategy matches a SoM element, in one round-trip.
+# Mirrors the Playwright lookups it replaces: exact text, aria/label text
+# (case-insensitive substring), role + accessible name, placeholder, CSS
+_RESOLVE_ELEMENT_JS = """
+([elem, mode]) => {
+    const norm = s => (s || '').replace(/\\s+/g, ' ').trim();
+    const lower = s => norm(s).toLowerCase();
+    function isVisible(el) {
+        const rect = el.getBoundingClientRect();
+        if (rect.width === 0 || rect.height === 0) return false;
+        const style = window.getComputedStyle(el);
+        return style.display !== 'none' && style.visibility !== 'hidden';
+    }
+    // Callers act on locator.first, so a strategy only counts when its first
+    // match (document order) is visible - like is_visible() on .first
+    const firstVisible = els => els.length > 0 && isVisible(els[0]);
+    const documentOrder = (a, b) =>
+        a === b ? 0 : (a.compareDocumentPosition(b) & Node.DOCUMENT_POSITION_FOLLOWING ? -1 : 1);
+
+    const text = norm(elem.text);
+    const aria = norm(elem.ariaLabel);
+    const role = elem.role || '';
+
+    function byText(value) {
+        // Exact text match on the innermost element carrying it. Cheap raw
+        // checks first (whitespace collapsing never adds characters or
+        // splits a word), so only real candidates get normalized
+        const probe = value.split(' ').reduce((a, b) => b.length > a.length ? b : a, '');
+        const matches = el => {
+            const raw = el.textContent;
+            return raw.length >= value.length && raw.includes(probe) && norm(raw) === value;
+        };
+        return firstVisible(Array.from(document.querySelectorAll('body *')).filter(el =>
+            matches(el) && !Array.from(el.children).some(matches)
+        ));
+    }
+    function byLabel(value) {
+        const needle = value.toLowerCase();
+        const labelled = Array.from(document.querySelectorAll('[aria-label]'))
+            .filter(el => lower(el.getAttribute('aria-label')).includes(needle));
+        const viaLabel = Array.from(document.querySelectorAll('label'))
+            .filter(l => lower(l.textContent).includes(needle) && l.control)
+            .map(l => l.control);
+        return firstVisible(labelled.concat(viaLabel).sort(documentOrder));
+    }
+    function byRole(roleName, name) {
+        const selectors = {
+            button: 'button, [role="button"], input[type="button"], input[type="submit"]',
+            link: 'a[href], [role="link"]',
+        };
+        const needle = name.toLowerCase();
+        return firstVisible(Array.from(document.querySelectorAll(selectors[roleName])).filter(el =>
+            lower(el.getAttribute('aria-label') || el.textContent || el.value).includes(needle)
+        ));
+    }
+    function byPlaceholder(value) {
+        const needle = value.toLowerCase();
+        return firstVisible(Array.from(document.querySelectorAll('[placeholder]'))
+            .filter(el => lower(el.getAttribute('placeholder')).includes(needle)));
+    }
+    function bySelector(selector) {
+        try {
+            return firstVisible(document.querySelectorAll(selector));
+        } catch (e) {
+            return null;  // Not plain CSS - let Playwright check it
+        }
+    }
+
+    const selector = norm(elem.selector);
+    if (mode === 'click') {
+        if (text && byText(text)) return 'text';
+        if (aria && byLabel(aria)) return 'label';
+        if ((role === 'button' || role === 'link') && text && byRole(role, text)) return 'role';
+    } else {
+        if (aria && byPlaceholder(aria)) return 'placeholder';
+        if (aria && byLabel(aria)) return 'label';
+        if (text && byText(text)) return 'text';
+    }
+    if (selector) {
+        const found = bySelector(selector);
+        if (found === null) return 'selector_unchecked';
+        if (found) return 'selector';
+    }
+    return null;
+}
+"""
+
+
+# Common patterns for close buttons in promotional modals. Plain CSS only -
+# these run through document.querySelectorAll, which rejects :has-text()
+_CLOSE_SELECTORS = (
+    '[aria-label*="close" i]',
+    '[aria-label*="dismiss" i]',
+    '[data-testid*="close"]',
+    '[data-testid*="dismiss"]',
+    'button[class*="close"]',
+    'button[class*="dismiss"]',
+    '[role="dialog"] button[aria-label*="close" i]',
+    # Notion-specific patterns
+    '[class*="notion"] [aria-label*="close" i]',
+)
+
+# Containers a promotional close button must sit inside
+_MODAL_CONTAINER_SELECTOR = (
+    '[role="dialog"], [class*="modal" i], [class*="dialog" i], '
+    '[class*="overlay" i], [class*="popup" i]'
+)
+
+# Clicks the first visible close button that sits inside a modal/overlay.
+# closest() does the ancestor match natively instead of a JS parent walk.
+_DISMISS_MODAL_JS = """
+([closeSelectors, containerSelector]) => {
+    for (const selector of closeSelectors) {
+        let buttons;
+        try {
+            buttons = document.querySelectorAll(selector);
+        } catch (e) {
+            continue;  // Selector might not be valid
+        }
+        for (const btn of buttons) {
+            const style = window.getComputedStyle(btn);
+            if (style.display === 'none' || style.visibility === 'hidden') continue;
+
+            // Page-level classes like body.modal-open don't count as a modal
+            const host = btn.parentElement && btn.parentElement.closest(containerSelector);
+            if (host && host !== document.body && host !== document.documentElement) {
+                btn.click();
+                return true;
+            }
+        }
+    }
+    return false;
+}
+"""
+
+
+# After a click: focus the active editable, or the first visible empty
+# contenteditable (clearing placeholder text), all in one atomic evaluate
+_FOCUS_EDITABLE_JS = """
+() => {
+    // Strategy 1: Check if there's already a focused editable
+    const focused = document.activeElement;
+    if (focused && (
+        focused.contentEditable === 'true' ||
+        focused.contentEditable === 'plaintext-only' ||
+        focused.tagName === 'INPUT' ||
+        focused.tagName === 'TEXTAREA'
+    )) {
+        focused.scrollIntoView({behavior: 'instant', block: 'center'});
+        return 'focused_existing';
+    }
+
+    function isVisible(elem) {
+        const rect = elem.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    }
+    function focusField(elem) {
+        elem.focus();
+        elem.scrollIntoView({behavior: 'instant', block: 'center'});
+    }
+
+    // Strategy 2: Truly empty fields - the selector engine filters them,
+    // no need to read every editable's text
+    for (const elem of document.querySelectorAll(
+        '[contenteditable="true"]:empty, [contenteditable="plaintext-only"]:empty'
+    )) {
+        if (isVisible(elem)) {
+            focusField(elem);
+            return 'found_empty';
+        }
+    }
+
+    // Strategy 3: Whitespace-only or placeholder-text fields
+    const editables = document.querySelectorAll('[contenteditable="true"], [contenteditable="plaintext-only"]');
+
+    for (let elem of editables) {
+        const text = elem.textContent || '';
+        const isEmpty = text.trim() === '' ||
+                       text.includes('Type a name') ||
+                       text.includes('Type here') ||
+                       text.includes('Enter text');
+
+        if (isEmpty && isVisible(elem)) {
+            focusField(elem);
+
+            // Clear placeholder text
+            if (text.includes('Type') || text.includes('Enter')) {
+                elem.textContent = '';
+            }
+
+            return 'found_empty';
+        }
+    }
+
+    return 'not_found';
+}
+"""
+
+
+# Resolves once a click visibly changed the page: new URL, a modal opened or
+# closed, or more than 5 elements added/removed (same test as execute_action's
+# snapshot comparison). Link clicks pass only the URL.
+_CLICK_EFFECT_JS = """
+(prev) => {
+    if (location.href !== prev.url) return true;
+    if (prev.modal_count === undefined) return false;
+    const modals = document.querySelectorAll('[role="dialog"], .modal, [class*="modal"]').length;
+    return modals !== prev.modal_count ||
+        Math.abs(document.getElementsByTagName('*').length - prev.element_count) > 5;
+}
+"""
+
+
+# Whether an element can be filled itself, via a contenteditable child, or not
+_FILL_TARGET_JS = """
+el => {
+    if (el.tagName === 'INPUT' || el.tagName === 'TEXTAREA' || el.hasAttribute('contenteditable')) {
+        return 'self';
+    }
+    return el.querySelector('[contenteditable]') ? 'child' : 'none';
+}
+"""
+
+# For locator.evaluate_all: [match count, visible count, first match visible]
+# in one round-trip. Same test as Playwright's is_visible(): non-empty box and
+# not visibility:hidden
+_COUNT_VISIBLE_JS = """
+els => {
+    const isVisible = el => {
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 &&
+            window.getComputedStyle(el).visibility !== 'hidden';
+    };
+    const visible = els.filter(isVisible);
+    return [els.length, visible.length, visible.length > 0 && visible[0] === els[0]];
+}
+"""
+
+# The page-level scripts above, installed once per context as window.__agentb
+# via add_init_script: each document parses them on load, and per-action
+# evaluates only send a short call stub plus arguments
+_AGENTB_HELPERS_JS = f"""
+window.__agentb = window.__agentb || {{
+    resolveElement: {_RESOLVE_ELEMENT_JS.strip()},
+    dismissModal: {_DISMISS_MODAL_JS.strip()},
+    focusEditable: {_FOCUS_EDITABLE_JS.strip()},
+}};
+"""
+
+# Wraps the result so a document without the helpers (loaded before they
+# were installed) returns null instead of throwing
+_CALL_HELPER_JS = "([name, arg]) => window.__agentb ? {value: window.__agentb[name](arg)} : null"
+
+# Contexts that already have the helper init script
+_helper_contexts: "weakref.WeakSet[BrowserContext]" = weakref.WeakSet()
+
+
+def _install_helpers(context: BrowserContext):
+    """Register the window.__agentb helpers on a context (once per context)"""
+    if context not in _helper_contexts:
+        context.add_init_script(_AGENTB_HELPERS_JS)
+        _helper_contexts.add(context)
+
+
+def _open_paths(paths: List[str]) -> Set[str]:
+    """
+    Find which of the given files are held open by any process
+
+    On Linux this reads /proc/<pid>/fd directly (no subprocess); elsewhere
+    it runs a single lsof for all paths.
+
+    Args:
+        paths: Absolute file paths to check
+
+    Returns:
+        The subset of paths that are open
+    """
+    wanted = set(paths)
+    if os.path.isdir('/proc/self/fd'):
+        found = set()
+        for pid in os.listdir('/proc'):
+            if not pid.isdigit():
+                continue
+            fd_dir = f'/proc/{pid}/fd'
+            try:
+                fds = os.listdir(fd_dir)
+            except OSError:
+                continue  # Process exited or isn't ours to inspect
+            for fd in fds:
+                try:
+                    target = os.readlink(f'{fd_dir}/{fd}')
+                except OSError:
+                    continue
+                if target in wanted:
+                    found.add(target)
+                    if found == wanted:
+                        return found
+        return found
+
+    import subprocess
+
+    result = subprocess.run(
+        ["lsof", "-F", "n", *paths],
+        capture_output=True,
+        text=True,
+        timeout=2
+    )
+    return {line[1:] for line in result.stdout.splitlines() if line[:1] == 'n' and line[1:] in wanted}
+
+
+# Playwright's sync API is bound to the thread that started it, so the
+# shared driver and cached persistent contexts are kept per thread
+_thread_state = threading.local()
+
+
+def get_thread_playwright() -> Playwright:
+    """
+    Get this thread's Playwright driver, starting it on first use
+
+    Starting the driver spawns a node subprocess (~300-500ms), and a thread
+    can only run one sync Playwright instance at a time - agents and pools
+    on the same thread share this one.
+    """
+    playwright = getattr(_thread_state, 'playwright', None)
+    if playwright is None:
+        playwright = sync_playwright().start()
+        _thread_state.playwright = playwright
+        _thread_state.contexts = {}
+    return playwright
+
+
+def _thread_contexts() -> Dict[str, BrowserContext]:
+    """Persistent contexts kept open on this thread, by session name"""
+    get_thread_playwright()
+    return _thread_state.contexts
+
+
+def _export_storage_state(context: BrowserContext, session_name: str):
+    """
+    Write a context's cookies/localStorage to state.json for pooled runs
+
+    Written to a temp file and swapped in with os.replace, so a pooled
+    checkout reading state.json concurrently never sees a partial file.
+    """
+    state_path = get_session_dir(session_name) / "state.json"
+    tmp_path = state_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    context.storage_state(path=str(tmp_path))
+    os.replace(tmp_path, state_path)
+
+
+def stop_thread_playwright():
+    """Close this thread's cached contexts and shared pools, then stop its Playwright driver"""
+    for session_name, context in list(getattr(_thread_state, 'contexts', {}).items()):
+        try:
+            # Export once per session lifetime rather than on every close()
+            _export_storage_state(context, session_name)
+            context.close()
+        except Exception:
+            pass
+    # Pools registered by browser_pool.get_thread_pool
+    for pool in getattr(_thread_state, 'pools', {}).values():
+        pool.close()
+    playwright = getattr(_thread_state, 'playwright', None)
+    if playwright:
+        playwright.stop()
+    _thread_state.playwright = None
+    _thread_state.contexts = {}
+    _thread_state.pools = {}
+
+
+# Runs on the main thread - worker threads call stop_thread_playwright() themselves
+atexit.register(stop_thread_playwright)
+
+
+# App host -> named group, for is_logged_in
+_APP_HOST_RE = re.compile(
+    r"(?P<asana>app\.asana\.com)|(?P<linear>linear\.app)|(?P<notion>notion\.so)|(?P<github>github\.com)"
+)
+
+
+def get_session_dir(session_name: str) -> Path:
+    """Directory holding the saved browser profile and state for a session"""
+    return Path(f"./browser_sessions/{session_name}")
 
 
 class PersistentBrowserAgent:
@@ -13,50 +411,67 @@ class PersistentBrowserAgent:
     This solves the OAuth/Google login problem by keeping sessions between runs.
     """
 
-    def __init__(self, headless: bool = HEADLESS, session_name: str = "default"):
+    def __init__(
+        self,
+        headless: bool = HEADLESS,
+        session_name: str = "default",
+        context: Optional[BrowserContext] = None
+    ):
         """
         Initialize browser with persistent context
 
         Args:
             headless: Run browser in headless mode
             session_name: Name for the session (allows multiple persistent contexts)
+            context: Optional context checked out from a BrowserPool. When given,
+                the agent opens its page there instead of launching a browser.
         """
         self.headless = headless
         self.session_name = session_name
         self.playwright: Optional[Playwright] = None
-        self.context: Optional[BrowserContext] = None
+        self.context: Optional[BrowserContext] = context
         self.page: Optional[Page] = None
+        self.pooled = context is not None
+        self._state_detector: Optional[StateDetector] = None
+        # Handle (not Locator) to the last filled field - press_key reuses it
+        # without re-running the selector query
+        self.last_filled_element: Optional[ElementHandle] = None
+        # Screenshot names: one wall-clock read per agent plus a counter
+        self._start_ts = int(time.time())
+        self._screenshot_seq = 0
+        # Bytes of the last take_screenshot() capture, for in-memory consumers
+        self.last_screenshot: Optional[bytes] = None
+        self._dirs_created: Set[Path] = set()  # Screenshot dirs already mkdir'd
+        # SoM element -> resolved locator string, valid while the URL is unchanged
+        self._locator_cache: Dict[tuple, str] = {}
+        self._locator_cache_url: Optional[str] = None
 
         # Create session directory
-        self.session_dir = Path(f"./browser_sessions/{session_name}")
+        self.session_dir = get_session_dir(session_name)
         self.session_dir.mkdir(parents=True, exist_ok=True)
 
     def _cleanup_stale_locks(self):
         """Remove stale lock files from crashed browser sessions"""
-        import subprocess
-
         lock_file = self.session_dir / "Default" / "LOCK"
         singleton_lock = self.session_dir / "SingletonLock"
 
-        for lock in [lock_file, singleton_lock]:
-            if lock.exists():
-                # Check if any process is actually using this lock
+        locks = [lock for lock in (lock_file, singleton_lock) if lock.exists()]
+        if not locks:
+            return
+
+        # Check once, for both locks, whether any process is actually using them
+        try:
+            in_use = _open_paths([str(lock.resolve()) for lock in locks])
+        except Exception:
+            in_use = set()  # If the check fails, just remove the locks
+
+        for lock in locks:
+            if str(lock.resolve()) not in in_use:
+                log.info(f"   🧹 Removing stale lock: {lock.name}")
                 try:
-                    result = subprocess.run(
-                        ["lsof", str(lock)],
-                        capture_output=True,
-                        text=True,
-                        timeout=2
-                    )
-                    if result.returncode != 0:  # No process using the lock
-                        print(f"   🧹 Removing stale lock: {lock.name}")
-                        lock.unlink()
+                    lock.unlink()
                 except:
-                    # If lsof fails or times out, just remove the lock
-                    try:
-                        lock.unlink()
-                    except:
-                        pass
+                    pass
 
     def __enter__(self):
         self.start()
@@ -64,14 +479,32 @@ class PersistentBrowserAgent:
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         if exc_type:
-            print(f"   ⚠️  Exception occurred in context: {exc_type.__name__}: {exc_val}")
+            log.info(f"   ⚠️  Exception occurred in context: {exc_type.__name__}: {exc_val}")
         self.close()
         return False  # Don't suppress exceptions
 
     def start(self):
         """Initialize browser with persistent context"""
-        print(f"🚀 Starting browser with session: {self.session_name}")
-        self.playwright = sync_playwright().start()
+        if self.pooled:
+            # Pooled context: the browser is already warm, just open a tab
+            log.info(f"🚀 Opening pooled browser page for session: {self.session_name}")
+            _install_helpers(self.context)
+            self.page = self.context.new_page()
+            self.page.set_default_timeout(BROWSER_TIMEOUT)
+            return
+
+        self.playwright = get_thread_playwright()
+        contexts = _thread_contexts()
+
+        # Reuse the session's context if an earlier agent on this thread left it open
+        self.context = contexts.get(self.session_name)
+        if self.context:
+            log.info(f"♻️  Reusing open browser for session: {self.session_name}")
+            self.page = self.context.pages[0] if self.context.pages else self.context.new_page()
+            self.page.set_default_timeout(BROWSER_TIMEOUT)
+            return
+
+        log.info(f"🚀 Starting browser with session: {self.session_name}")
 
         # Clean up stale lock files from crashed sessions
         self._cleanup_stale_locks()
@@ -79,7 +512,7 @@ class PersistentBrowserAgent:
         # Launch with persistent context - THIS IS THE KEY!
         # It saves cookies, localStorage, and sessions
         try:
-            print(f"   Launching persistent context with session dir: {self.session_dir}")
+            log.info(f"   Launching persistent context with session dir: {self.session_dir}")
             self.context = self.playwright.chromium.launch_persistent_context(
                 user_data_dir=str(self.session_dir),
                 headless=self.headless,
@@ -87,19 +520,25 @@ class PersistentBrowserAgent:
                 viewport={'width': 1920, 'height': 1200},
                 # Set device scale factor for retina/high-DPI displays
                 device_scale_factor=1,
-                # Removed problematic settings that may cause crashes
-                slow_mo=50,  # Add slight delay to help with stability
+                # No slow_mo: it delayed every Playwright call, including
+                # reads - the post-click wait in execute_action covers settling
+                args=list(CHROMIUM_ARGS),
             )
-            print(f"   ✅ Persistent context launched successfully")
+            log.info(f"   ✅ Persistent context launched successfully")
         except Exception as e:
-            print(f"   ⚠️  Failed to launch persistent context: {e}")
-            print(f"   Retrying with minimal settings...")
+            log.info(f"   ⚠️  Failed to launch persistent context: {e}")
+            log.info(f"   Retrying with minimal settings...")
             # Fallback: Try with absolute minimal settings
             self.context = self.playwright.chromium.launch_persistent_context(
                 user_data_dir=str(self.session_dir),
                 headless=self.headless,
             )
         
+        _install_helpers(self.context)
+        session_name = self.session_name
+        contexts[session_name] = self.context
+        self.context.on("close", lambda _: contexts.pop(session_name, None))
+        
         # Get the first page or create new one
         if self.context.pages:
             self.page = self.context.pages[0]
@@ -107,7 +546,7 @@ class PersistentBrowserAgent:
             self.page = self.context.new_page()
             
         self.page.set_default_timeout(BROWSER_TIMEOUT)
-        print(f"✅ Browser started with persistent session!")
+        log.info(f"✅ Browser started with persistent session!")
         
     def is_logged_in(self, app: str) -> bool:
         """
@@ -119,20 +558,12 @@ class PersistentBrowserAgent:
         Returns:
             True if logged in
         """
-        app_checks = {
-            'asana': lambda: 'app.asana.com' in self.page.url and '/login' not in self.page.url,
-            'linear': lambda: 'linear.app' in self.page.url and '/login' not in self.page.url,
-            'notion': lambda: 'notion.so' in self.page.url and '/login' not in self.page.url,
-            'github': lambda: 'github.com' in self.page.url and '/login' not in self.page.url,
-        }
-        
-        checker = app_checks.get(app.lower())
-        if checker:
-            try:
-                return checker()
-            except:
-                return False
-        return False
+        try:
+            url = self.page.url
+        except:
+            return False
+        match = _APP_HOST_RE.search(url)
+        return bool(match and match.lastgroup == app.lower() and '/login' not in url)
 
     def manual_login_helper(self, app: str):
         """
@@ -151,14 +582,14 @@ class PersistentBrowserAgent:
         
         url = login_urls.get(app.lower(), f"https://{app.lower()}.com/login")
         
-        print(f"\n{'='*60}")
-        print(f"📋 MANUAL LOGIN REQUIRED for {app}")
-        print(f"{'='*60}")
-        print(f"1. The browser will open {app}'s login page")
-        print(f"2. Please login manually (including Google OAuth)")
-        print(f"3. Once logged in, press Enter here to continue")
-        print(f"4. The session will be saved for future runs!")
-        print(f"{'='*60}\n")
+        log.info(f"\n{'='*60}")
+        log.info(f"📋 MANUAL LOGIN REQUIRED for {app}")
+        log.info(f"{'='*60}")
+        log.info(f"1. The browser will open {app}'s login page")
+        log.info(f"2. Please login manually (including Google OAuth)")
+        log.info(f"3. Once logged in, press Enter here to continue")
+        log.info(f"4. The session will be saved for future runs!")
+        log.info(f"{'='*60}\n")
         
         self.goto(url)
         
@@ -167,77 +598,154 @@ class PersistentBrowserAgent:
         
         # Save the session
         self.context.storage_state(path=str(self.session_dir / f"{app}_auth.json"))
-        print(f"✅ Session saved for {app}!")
+        log.info(f"✅ Session saved for {app}!")
         
-    def goto(self, url: str):
-        """Navigate to URL"""
-        print(f"🌐 Navigating to: {url}")
-        self.page.goto(url)
+    def _wait_until_settled(self, networkidle_timeout: int = 1500):
+        """
+        Wait for the page to be usable without stalling on long-polling apps
+
+        DOMContentLoaded plus one idle frame is enough for most pages; the
+        networkidle wait is capped because SPAs like Notion/Linear poll
+        constantly and may never go quiet.
+
+        Args:
+            networkidle_timeout: Max milliseconds to wait for network idle
+        """
+        self.page.wait_for_load_state("domcontentloaded")
         try:
-            self.page.wait_for_load_state("networkidle", timeout=10000)
+            self.page.evaluate(_IDLE_CALLBACK_JS)
         except Exception:
-            self.page.wait_for_load_state("domcontentloaded")
-        print("✅ Page loaded!")
+            pass  # Context replaced by a navigation - the load wait below covers it
+        try:
+            self.page.wait_for_load_state("networkidle", timeout=networkidle_timeout)
+        except Exception:
+            pass
+
+    def _forget_filled_element(self):
+        """Dispose the last filled field's handle so the page can free it"""
+        if self.last_filled_element is not None:
+            try:
+                self.last_filled_element.dispose()
+            except Exception:
+                pass  # Already gone with its page/document
+            self.last_filled_element = None
+
+    def goto(self, url: str, networkidle_timeout: int = 1500):
+        """Navigate to URL"""
+        log.info(f"🌐 Navigating to: {url}")
+        self._state_detector = None
+        self._forget_filled_element()
+        self._locator_cache.clear()
+        self.page.goto(url, wait_until="domcontentloaded")
+        self._wait_until_settled(networkidle_timeout)
+        log.info("✅ Page loaded!")
+
+    def capture(self) -> bytes:
+        """Capture the viewport as JPEG bytes without writing a file"""
+        return self.page.screenshot(type='jpeg', quality=SCREENSHOT_JPEG_QUALITY)
 
     def take_screenshot(self, name: str, task_dir: Optional[Path] = None) -> Path:
         """
         Take a screenshot and save it
 
         Uses viewport-sized screenshots instead of full_page to avoid layout issues
-        and ensure consistent capture area for the LLM
+        and ensure consistent capture area for the LLM. Saved as JPEG, which
+        Chromium encodes several times faster than PNG at a fraction of the size.
         """
-        if task_dir:
-            save_dir = SCREENSHOTS_DIR / task_dir
+        save_dir = SCREENSHOTS_DIR / task_dir if task_dir else SCREENSHOTS_DIR
+        if save_dir not in self._dirs_created:
             save_dir.mkdir(parents=True, exist_ok=True)
-        else:
-            save_dir = SCREENSHOTS_DIR
+            self._dirs_created.add(save_dir)
 
-        timestamp = int(time.time())
-        filename = f"{name}_{timestamp}.png"
+        self._screenshot_seq += 1
+        timestamp = f"{self._start_ts}_{self._screenshot_seq}"
+        filename = f"{name}_{timestamp}.jpg"
         filepath = save_dir / filename
 
-        print(f"📸 Taking screenshot: {filename}")
+        log.info(f"📸 Taking screenshot: {filename}")
         # Use full_page=False for consistent viewport capture
         # This avoids oddly shaped screenshots and matches what user sees
-        self.page.screenshot(path=str(filepath), full_page=False)
-        print(f"✅ Screenshot saved: {filepath}")
+        # Playwright returns the bytes it wrote - kept so annotation and the
+        # LLM call don't have to read the file back
+        self.last_screenshot = self.page.screenshot(
+            path=str(filepath),
+            full_page=False,
+            type='jpeg',
+            quality=SCREENSHOT_JPEG_QUALITY,
+        )
+        log.info(f"✅ Screenshot saved: {filepath}")
 
         return filepath
     
     def click(self, selector: str):
         """Click an element"""
-        print(f"🖱️  Clicking: {selector}")
-        self.page.click(selector)
-        self.page.wait_for_load_state("networkidle")
+        log.info(f"🖱️  Clicking: {selector}")
+        clicked = False
+        try:
+            # Race: a navigation starting within 300ms, or an in-place update
+            with self.page.expect_event("framenavigated", timeout=300):
+                self.page.click(selector)
+                clicked = True
+            self.page.wait_for_load_state("domcontentloaded")
+        except PlaywrightTimeoutError:
+            if not clicked:
+                raise  # The click itself timed out
+        try:
+            self.page.wait_for_function("document.readyState === 'complete'", timeout=800)
+        except PlaywrightTimeoutError:
+            pass
 
     def fill(self, selector: str, text: str):
         """Fill a text input"""
-        print(f"⌨️  Filling '{selector}' with: {text}")
+        log.info(f"⌨️  Filling '{selector}' with: {text}")
         self.page.fill(selector, text)
 
     def wait(self, milliseconds: int = 1000):
         """Wait for a specified time"""
-        print(f"⏳ Waiting {milliseconds}ms...")
+        log.info(f"⏳ Waiting {milliseconds}ms...")
         self.page.wait_for_timeout(milliseconds)
     
-    def close(self):
-        """Close browser but keep session"""
+    def close(self, release: bool = False):
+        """
+        Close browser but keep session
+
+        Args:
+            release: Also close the persistent context. By default it stays
+                open for the next agent with this session on the same thread
+                (closed at exit). For a pooled page, also export the session
+                state to state.json.
+        """
+        # The page may outlive this agent (kept open for reuse)
+        self._forget_filled_element()
+        if self.pooled:
+            # Parallel workers share one state.json, so it isn't rewritten on
+            # every checkout - only when the caller asks for it
+            if release:
+                log.info("🔚 Closing pooled page (session state saved)...")
+                _export_storage_state(self.context, self.session_name)
+            self.page.close()
+            return
+
         if self.context:
-            print("🔚 Closing browser (session preserved)...")
-            # Save state before closing
-            self.context.storage_state(path=str(self.session_dir / "state.json"))
-            self.context.close()
-        if self.playwright:
-            self.playwright.stop()
-        print("✅ Browser closed! Session saved for next run.")
+            # The profile dir already persists cookies - state.json (read by
+            # pooled runs) is only exported when the context actually closes
+            if release:
+                log.info("🔚 Closing browser (session preserved)...")
+                _export_storage_state(self.context, self.session_name)
+                self.context.close()
+                log.info("✅ Browser closed! Session saved for next run.")
+            else:
+                log.info("💾 Browser kept open for reuse")
 
     def get_page_title(self) -> str:
         """Get current page title"""
         return self.page.title()
     
     def get_state_detector(self) -> StateDetector:
-        """Get a state detector for this page"""
-        return StateDetector(self.page)
+        """Get the state detector for this page (created once, reset by goto)"""
+        if self._state_detector is None or self._state_detector.page is not self.page:
+            self._state_detector = StateDetector(self.page)
+        return self._state_detector
 
     def dismiss_promotional_modals(self) -> bool:
         """
@@ -253,70 +761,91 @@ class PersistentBrowserAgent:
             True if a modal was dismissed, False otherwise
         """
         try:
-            dismissed = self.page.evaluate("""
-                () => {
-                    // Common patterns for close buttons in promotional modals
-                    const closeSelectors = [
-                        '[aria-label*="close" i]',
-                        '[aria-label*="dismiss" i]',
-                        '[data-testid*="close"]',
-                        '[data-testid*="dismiss"]',
-                        'button[class*="close"]',
-                        'button[class*="dismiss"]',
-                        '.modal button:has-text("×")',
-                        '.modal button:has-text("Close")',
-                        '[role="dialog"] button[aria-label*="close" i]',
-                        // Notion-specific patterns
-                        '[class*="notion"] button:has-text("×")',
-                        '[class*="notion"] [aria-label*="close" i]',
-                    ];
-
-                    for (const selector of closeSelectors) {
-                        try {
-                            const buttons = document.querySelectorAll(selector);
-                            for (const btn of buttons) {
-                                const style = window.getComputedStyle(btn);
-                                if (style.display !== 'none' && style.visibility !== 'hidden') {
-                                    // Check if button is in a modal/overlay
-                                    let parent = btn.parentElement;
-                                    let inModal = false;
-                                    for (let i = 0; i < 10 && parent; i++) {
-                                        const classes = parent.className?.toLowerCase() || '';
-                                        const role = parent.getAttribute('role');
-                                        if (classes.includes('modal') ||
-                                            classes.includes('dialog') ||
-                                            classes.includes('overlay') ||
-                                            classes.includes('popup') ||
-                                            role === 'dialog') {
-                                            inModal = true;
-                                            break;
-                                        }
-                                        parent = parent.parentElement;
-                                    }
-
-                                    if (inModal) {
-                                        btn.click();
-                                        return true;
-                                    }
-                                }
-                            }
-                        } catch (e) {
-                            // Selector might not be valid, continue
-                        }
-                    }
-                    return false;
-                }
-            """)
+            dismissed = self._call_helper(
+                'dismissModal', [_CLOSE_SELECTORS, _MODAL_CONTAINER_SELECTOR]
+            )
 
             if dismissed:
-                print("   ✓ Dismissed promotional modal")
+                log.info("   ✓ Dismissed promotional modal")
                 self.wait(1000)  # Wait for modal to close
                 return True
             return False
 
         except Exception as e:
-            print(f"   ⚠️  Modal dismissal attempt failed: {e}")
+            log.warning(f"   ⚠️  Modal dismissal attempt failed: {e}")
+            return False
+
+    def _call_helper(self, name: str, arg: Any = None) -> Any:
+        """
+        Call a window.__agentb helper on the current page
+
+        Args:
+            name: Helper name (resolveElement, dismissModal, focusEditable)
+            arg: Single JSON-serializable argument
+
+        Returns:
+            The helper's return value
+        """
+        result = self.page.evaluate(_CALL_HELPER_JS, [name, arg])
+        if result is None:
+            # Document predates the init script - inject the helpers once
+            self.page.evaluate(_AGENTB_HELPERS_JS)
+            result = self.page.evaluate(_CALL_HELPER_JS, [name, arg])
+        return result['value']
+
+    def _wait_for_hint(self, action: Dict[str, Any], timeout: int = 3000) -> bool:
+        """
+        Wait for the text the LLM said should appear after an action
+
+        Args:
+            action: Action dict, optionally carrying a 'wait_for' text hint
+            timeout: Max milliseconds to wait for the text to become visible
+
+        Returns:
+            True if a hint was given (whether or not it appeared in time)
+        """
+        hint = action.get('wait_for')
+        if not hint:
             return False
+        try:
+            self.page.get_by_text(hint).first.wait_for(state="visible", timeout=timeout)
+        except PlaywrightTimeoutError:
+            log.info(f"   ⚠️  '{hint[:30]}' did not appear within {timeout}ms")
+        return True
+
+    def _settle_after_input(self, action: Dict[str, Any]):
+        """
+        Let the page react to typed input or a key press without a fixed sleep
+
+        Uses the action's wait_for hint when present, otherwise waits for any
+        triggered load to reach DOMContentLoaded plus one idle frame.
+
+        Args:
+            action: The action just executed
+        """
+        if self._wait_for_hint(action):
+            return
+        try:
+            self.page.wait_for_load_state("domcontentloaded")
+            self.page.evaluate(_IDLE_CALLBACK_JS)
+        except Exception:
+            pass  # Context replaced by a navigation mid-wait
+
+    def _count_and_visible(self, locator) -> Tuple[int, int, bool]:
+        """
+        Count a locator's matches and check visibility in one round-trip
+
+        Replaces the count() + first.is_visible() pair (two CDP calls, or
+        N+1 when checking every match).
+
+        Args:
+            locator: Playwright locator (any selector engine)
+
+        Returns:
+            (match count, visible match count, whether the first match is visible)
+        """
+        count, visible_count, first_visible = locator.evaluate_all(_COUNT_VISIBLE_JS)
+        return count, visible_count, first_visible
 
     def find_element_by_visual_description(self, target_text: str, target_description: str = "") -> Optional[str]:
         """
@@ -332,47 +861,47 @@ class PersistentBrowserAgent:
         Returns:
             Playwright-compatible locator string, or None if not found
         """
-        print(f"   🔍 Searching for element with text: '{target_text}'")
+        log.info(f"   🔍 Searching for element with text: '{target_text}'")
 
         # Strategy 1: Try exact text match with getByText (most reliable for SPAs)
         try:
-            locator = self.page.get_by_text(target_text, exact=True)
-            if locator.count() > 0 and locator.first.is_visible():
-                print(f"   ✓ Found by exact text")
+            _, _, visible = self._count_and_visible(self.page.get_by_text(target_text, exact=True))
+            if visible:
+                log.info(f"   ✓ Found by exact text")
                 return f'text="{target_text}"'
         except:
             pass
 
         # Strategy 2: Try partial text match
         try:
-            locator = self.page.get_by_text(target_text, exact=False)
-            if locator.count() > 0:
-                # If multiple matches, try to use description to disambiguate
-                visible_count = sum(1 for i in range(locator.count()) if locator.nth(i).is_visible())
-                if visible_count == 1:
-                    print(f"   ✓ Found by partial text (1 visible match)")
-                    return f'text="{target_text}"'
-                elif visible_count > 1:
-                    print(f"   ⚠️  Multiple matches ({visible_count}), using first visible")
-                    return f'text="{target_text}"'
+            _, visible_count, _ = self._count_and_visible(
+                self.page.get_by_text(target_text, exact=False)
+            )
+            # If multiple matches, try to use description to disambiguate
+            if visible_count == 1:
+                log.info(f"   ✓ Found by partial text (1 visible match)")
+                return f'text="{target_text}"'
+            elif visible_count > 1:
+                log.info(f"   ⚠️  Multiple matches ({visible_count}), using first visible")
+                return f'text="{target_text}"'
         except:
             pass
 
         # Strategy 3: Try role-based matching with text
         if "button" in target_description.lower():
             try:
-                locator = self.page.get_by_role("button", name=target_text)
-                if locator.count() > 0 and locator.first.is_visible():
-                    print(f"   ✓ Found button by role")
+                _, _, visible = self._count_and_visible(self.page.get_by_role("button", name=target_text))
+                if visible:
+                    log.info(f"   ✓ Found button by role")
                     return f'role=button[name="{target_text}"]'
             except:
                 pass
 
         if "link" in target_description.lower():
             try:
-                locator = self.page.get_by_role("link", name=target_text)
-                if locator.count() > 0 and locator.first.is_visible():
-                    print(f"   ✓ Found link by role")
+                _, _, visible = self._count_and_visible(self.page.get_by_role("link", name=target_text))
+                if visible:
+                    log.info(f"   ✓ Found link by role")
                     return f'role=link[name="{target_text}"]'
             except:
                 pass
@@ -380,33 +909,148 @@ class PersistentBrowserAgent:
         # Strategy 4: Try placeholder/label for inputs
         if "input" in target_description.lower() or "field" in target_description.lower():
             try:
-                locator = self.page.get_by_placeholder(target_text)
-                if locator.count() > 0 and locator.first.is_visible():
-                    print(f"   ✓ Found input by placeholder")
+                _, _, visible = self._count_and_visible(self.page.get_by_placeholder(target_text))
+                if visible:
+                    log.info(f"   ✓ Found input by placeholder")
                     return f'placeholder="{target_text}"'
             except:
                 pass
 
             try:
-                locator = self.page.get_by_label(target_text)
-                if locator.count() > 0 and locator.first.is_visible():
-                    print(f"   ✓ Found input by label")
+                _, _, visible = self._count_and_visible(self.page.get_by_label(target_text))
+                if visible:
+                    log.info(f"   ✓ Found input by label")
                     return f'label="{target_text}"'
             except:
                 pass
 
-        print(f"   ✗ Could not find element with text '{target_text}'")
+        log.info(f"   ✗ Could not find element with text '{target_text}'")
         return None
 
-    def execute_action(self, action: Dict[str, Any], element_mapping: Dict[int, Dict] = None) -> bool:
+    def _resolve_element_locator(self, elem_data: Dict[str, Any], mode: str) -> Optional[str]:
+        """
+        Pick the locator string for a SoM element, cached until the URL changes
+
+        SoM ids are renumbered every screenshot, so the cache is keyed on the
+        element's text/label/role/selector rather than its id. Misses are not
+        cached - the element may still be rendering.
+
+        Args:
+            elem_data: Element entry from the SoM element mapping
+            mode: 'click' or 'fill' (see _match_element_locator)
+
+        Returns:
+            Locator string understood by execute_action, or None if not found
+        """
+        url = self.page.url
+        if url != self._locator_cache_url:
+            self._locator_cache.clear()
+            self._locator_cache_url = url
+
+        key = (
+            mode,
+            elem_data.get('text', ''),
+            elem_data.get('ariaLabel', ''),
+            elem_data.get('role', ''),
+            elem_data.get('selector', ''),
+        )
+        cached = self._locator_cache.get(key)
+        if cached:
+            log.info(f"   ✓ Reusing resolved locator")
+            return cached
+
+        locator_str = self._match_element_locator(elem_data, mode)
+        if locator_str:
+            self._locator_cache[key] = locator_str
+        return locator_str
+
+    def _match_element_locator(self, elem_data: Dict[str, Any], mode: str) -> Optional[str]:
+        """
+        Pick the locator string for a SoM element with a single page.evaluate
+
+        Args:
+            elem_data: Element entry from the SoM element mapping
+            mode: 'click' (text, aria-label, role+text, CSS) or
+                'fill' (placeholder, label, text, CSS)
+
+        Returns:
+            Locator string understood by execute_action, or None if not found
+        """
+        text = elem_data.get('text', '').strip()
+        aria = elem_data.get('ariaLabel', '').strip()
+        selector = elem_data.get('selector', '').strip()
+
+        try:
+            strategy = self._call_helper('resolveElement', [elem_data, mode])
+        except Exception:
+            strategy = None
+
+        if strategy == 'text':
+            log.info(f"   ✓ Found by text: '{text[:30]}...'")
+            return f'text="{text}"'
+        if strategy == 'label':
+            log.info(f"   ✓ Found by aria-label: '{aria[:30]}...'")
+            return f'label="{aria}"'
+        if strategy == 'role':
+            role = elem_data.get('role', '')
+            log.info(f"   ✓ Found by role+text: {role} '{text[:30]}...'")
+            return f'role={role}[name="{text}"]'
+        if strategy == 'placeholder':
+            log.info(f"   ✓ Found by placeholder")
+            return f'placeholder="{aria}"'
+        if strategy == 'selector':
+            log.info(f"   ✓ Found by selector")
+            return selector
+        if strategy == 'selector_unchecked':
+            # Playwright-only selector syntax - check it through Playwright's engine
+            try:
+                _, _, visible = self._count_and_visible(self.page.locator(selector))
+                if visible:
+                    log.info(f"   ✓ Found by selector")
+                    return selector
+            except:
+                pass
+        return None
+
+    def execute_batch(self, actions: List[Dict[str, Any]], element_mapping: Dict[int, Dict] = None) -> bool:
+        """
+        Execute several actions from one LLM decision in a single pass
+
+        Intermediate steps skip their fixed settle waits - the caller waits
+        and screenshots once after the whole batch.
+
+        Args:
+            actions: Action dicts, in order (all against the same element_mapping)
+            element_mapping: SoM element mapping from the current screenshot
+
+        Returns:
+            True if every step succeeded; stops at the first failure
+        """
+        log.info(f"Executing: Batch of {len(actions)} actions")
+        for i, step in enumerate(actions):
+            if not self.execute_action(step, element_mapping, settle=(i == len(actions) - 1)):
+                log.info(f"   ✗ Batch stopped at step {i + 1}/{len(actions)}")
+                return False
+        return True
+
+    def execute_action(
+        self,
+        action: Dict[str, Any],
+        element_mapping: Dict[int, Dict] = None,
+        settle: bool = True
+    ) -> bool:
         """
         Execute action using SET-OF-MARKS (SoM) approach.
 
         Expects action with element_id and uses element_mapping to find the element.
         Falls back to visual-first approach if element_id not provided.
+        With settle=False (intermediate batch steps) fixed post-action waits are skipped.
         """
         action_type = action.get('action')
 
+        if action_type == 'batch':
+            return self.execute_batch(action.get('actions', []), element_mapping)
+
         try:
             if action_type == 'click':
                 # NEW: SoM approach - use element_id from mapping
@@ -415,76 +1059,29 @@ class PersistentBrowserAgent:
                 if element_id and element_mapping and element_id in element_mapping:
                     # SoM: Use element from mapping
                     elem_data = element_mapping[element_id]
-                    print(f"Executing: Click element [{element_id}] ({elem_data.get('role', 'element')})")
-
-                    # Try to find element using its data
-                    locator_str = None
+                    log.info(f"Executing: Click element [{element_id}] ({elem_data.get('role', 'element')})")
 
-                    # Strategy 1: Try by text content
-                    text = elem_data.get('text', '').strip()
-                    if text:
-                        try:
-                            locator = self.page.get_by_text(text, exact=True)
-                            if locator.count() > 0 and locator.first.is_visible():
-                                locator_str = f'text="{text}"'
-                                print(f"   ✓ Found by text: '{text[:30]}...'")
-                        except:
-                            pass
-
-                    # Strategy 2: Try by aria-label
-                    if not locator_str:
-                        aria = elem_data.get('ariaLabel', '').strip()
-                        if aria:
-                            try:
-                                locator = self.page.get_by_label(aria)
-                                if locator.count() > 0 and locator.first.is_visible():
-                                    locator_str = f'label="{aria}"'
-                                    print(f"   ✓ Found by aria-label: '{aria[:30]}...'")
-                            except:
-                                pass
-
-                    # Strategy 3: Try by role + text
-                    if not locator_str:
-                        role = elem_data.get('role', '')
-                        if role in ['button', 'link'] and text:
-                            try:
-                                locator = self.page.get_by_role(role, name=text)
-                                if locator.count() > 0 and locator.first.is_visible():
-                                    locator_str = f'role={role}[name="{text}"]'
-                                    print(f"   ✓ Found by role+text: {role} '{text[:30]}...'")
-                            except:
-                                pass
-
-                    # Strategy 4: Try CSS selector if provided
-                    if not locator_str:
-                        selector = elem_data.get('selector', '').strip()
-                        if selector:
-                            try:
-                                locator = self.page.locator(selector)
-                                if locator.count() > 0 and locator.first.is_visible():
-                                    locator_str = selector
-                                    print(f"   ✓ Found by selector")
-                            except:
-                                pass
+                    # Find which lookup strategy matches, in one round-trip
+                    locator_str = self._resolve_element_locator(elem_data, 'click')
 
                     if not locator_str:
-                        print(f"   ✗ Could not find element [{element_id}]")
+                        log.info(f"   ✗ Could not find element [{element_id}]")
                         return False
 
                 else:
                     # Fallback: Visual-first approach (old method)
                     target_text = action.get('target_text', '')
                     target_description = action.get('target_description', '')
-                    print(f"Executing: Click '{target_text}' (fallback mode)")
+                    log.info(f"Executing: Click '{target_text}' (fallback mode)")
 
                     locator_str = self.find_element_by_visual_description(target_text, target_description)
                     if not locator_str:
                         selector = action.get('selector')
                         if selector:
-                            print(f"   ⚠️  Falling back to CSS selector: {selector}")
+                            log.info(f"   ⚠️  Falling back to CSS selector: {selector}")
                             locator_str = selector
                         else:
-                            print(f"   ✗ Could not find element")
+                            log.info(f"   ✗ Could not find element")
                             return False
 
                 # Click using resolved locator
@@ -505,87 +1102,72 @@ class PersistentBrowserAgent:
                     else:
                         element = self.page.locator(locator_str).first
 
-                    # Get state before click for verification
-                    detector = self.get_state_detector()
-                    before_state = detector.get_dom_snapshot()
-
-                    element.click(timeout=10000)
-                    self.wait(1000)
+                    # Links show their effect as a URL change, which page.url
+                    # tracks from navigation events - no DOM snapshots needed
+                    is_link = (
+                        locator_str.startswith('role=link') or
+                        (element_mapping or {}).get(element_id, {}).get('role') == 'link'
+                    )
+                    needs_verification = not is_link
+                    url_before = self.page.url
+
+                    # Get state before click for verification. Always fresh:
+                    # fills, key presses and waits since the last click change
+                    # the page too, and the snapshot is cached page-side
+                    # (O(1) while nothing has mutated)
+                    if needs_verification:
+                        detector = self.get_state_detector()
+                        before_state = detector.get_dom_snapshot()
+
+                    # Don't wait for a navigation the click may not trigger -
+                    # poll in-page for a visible effect instead of a fixed 1s
+                    element.click(timeout=10000, no_wait_after=True)
+                    if not self._wait_for_hint(action):
+                        try:
+                            self.page.wait_for_function(
+                                _CLICK_EFFECT_JS,
+                                arg=before_state if needs_verification else {'url': url_before},
+                                polling=100,
+                                timeout=1000,
+                            )
+                        except PlaywrightTimeoutError:
+                            pass  # No visible change within 1s - verified below
 
                     # After click, check for new empty contenteditable fields - ATOMIC APPROACH
                     try:
                         # Use JavaScript to find, focus, and scroll in ONE atomic operation
                         # This prevents position mismatch issues with Notion's dynamic fields
-                        found_and_focused = self.page.evaluate('''
-                            () => {
-                                // Strategy 1: Check if there's already a focused editable
-                                const focused = document.activeElement;
-                                if (focused && (
-                                    focused.contentEditable === 'true' ||
-                                    focused.contentEditable === 'plaintext-only' ||
-                                    focused.tagName === 'INPUT' ||
-                                    focused.tagName === 'TEXTAREA'
-                                )) {
-                                    focused.scrollIntoView({behavior: 'instant', block: 'center'});
-                                    return 'focused_existing';
-                                }
-
-                                // Strategy 2: Find empty contenteditable fields
-                                const editables = document.querySelectorAll('[contenteditable="true"], [contenteditable="plaintext-only"]');
-
-                                for (let elem of editables) {
-                                    const text = elem.textContent || '';
-                                    const isEmpty = text.trim() === '' ||
-                                                   text.includes('Type a name') ||
-                                                   text.includes('Type here') ||
-                                                   text.includes('Enter text');
-
-                                    const rect = elem.getBoundingClientRect();
-                                    const isVisible = rect.width > 0 && rect.height > 0;
-
-                                    if (isEmpty && isVisible) {
-                                        elem.focus();
-                                        elem.scrollIntoView({behavior: 'instant', block: 'center'});
-
-                                        // Clear placeholder text
-                                        if (text.includes('Type') || text.includes('Enter')) {
-                                            elem.textContent = '';
-                                        }
-
-                                        return 'found_empty';
-                                    }
-                                }
-
-                                return 'not_found';
-                            }
-                        ''')
+                        found_and_focused = self._call_helper('focusEditable')
 
                         if found_and_focused == 'focused_existing':
-                            print(f"   → Found already-focused input field")
+                            log.info(f"   → Found already-focused input field")
                         elif found_and_focused == 'found_empty':
-                            print(f"   → Found and focused empty contenteditable field")
+                            log.info(f"   → Found and focused empty contenteditable field")
 
                     except Exception as e:
-                        print(f"   ⚠️  Failed to handle new field: {str(e)[:50]}")
+                        log.info(f"   ⚠️  Failed to handle new field: {str(e)[:50]}")
 
                     # Verify the click had an effect
-                    after_state = detector.get_dom_snapshot()
-                    state_changed = (
-                        before_state['url'] != after_state['url'] or
-                        before_state['modal_count'] != after_state['modal_count'] or
-                        abs(before_state['element_count'] - after_state['element_count']) > 5
-                    )
+                    if needs_verification:
+                        after_state = detector.get_dom_snapshot()
+                        state_changed = (
+                            before_state['url'] != after_state['url'] or
+                            before_state['modal_count'] != after_state['modal_count'] or
+                            abs(before_state['element_count'] - after_state['element_count']) > 5
+                        )
+                    else:
+                        state_changed = self.page.url != url_before
 
                     if state_changed:
-                        print(f"   ✓ Click successful (state changed)")
+                        log.info(f"   ✓ Click successful (state changed)")
                         return True
                     else:
-                        print(f"   ⚠️  Click executed but no state change detected")
+                        log.info(f"   ⚠️  Click executed but no state change detected")
                         # Still return True since click didn't throw error
                         # The LLM will see no progress and try a different approach
                         return True
                 except Exception as click_error:
-                    print(f"   ✗ Click failed: {str(click_error)[:100]}")
+                    log.warning(f"   ✗ Click failed: {str(click_error)[:100]}")
                     return False
 
             elif action_type == 'fill':
@@ -595,58 +1177,14 @@ class PersistentBrowserAgent:
                 if element_id and element_mapping and element_id in element_mapping:
                     # SoM: Use element from mapping
                     elem_data = element_mapping[element_id]
-                    print(f"Executing: Fill element [{element_id}] with '{text}'")
+                    log.info(f"Executing: Fill element [{element_id}] with '{text}'")
 
-                    locator_str = None
+                    # Find which lookup strategy matches, in one round-trip
+                    locator_str = self._resolve_element_locator(elem_data, 'fill')
 
-                    # Strategy 1: Try by placeholder
-                    placeholder = elem_data.get('ariaLabel', '').strip()
-                    if placeholder:
-                        try:
-                            locator = self.page.get_by_placeholder(placeholder)
-                            if locator.count() > 0 and locator.first.is_visible():
-                                locator_str = f'placeholder="{placeholder}"'
-                                print(f"   ✓ Found by placeholder")
-                        except:
-                            pass
-
-                    # Strategy 2: Try by label
-                    if not locator_str and placeholder:
-                        try:
-                            locator = self.page.get_by_label(placeholder)
-                            if locator.count() > 0 and locator.first.is_visible():
-                                locator_str = f'label="{placeholder}"'
-                                print(f"   ✓ Found by label")
-                        except:
-                            pass
-
-                    # Strategy 3: Try by text content
-                    if not locator_str:
-                        elem_text = elem_data.get('text', '').strip()
-                        if elem_text:
-                            try:
-                                locator = self.page.get_by_text(elem_text, exact=True)
-                                if locator.count() > 0 and locator.first.is_visible():
-                                    locator_str = f'text="{elem_text}"'
-                                    print(f"   ✓ Found by text")
-                            except:
-                                pass
-
-                    # Strategy 4: Try CSS selector
                     if not locator_str:
-                        selector = elem_data.get('selector', '').strip()
-                        if selector:
-                            try:
-                                locator = self.page.locator(selector)
-                                if locator.count() > 0 and locator.first.is_visible():
-                                    locator_str = selector
-                                    print(f"   ✓ Found by selector")
-                            except:
-                                pass
-
-                    if not locator_str:
-                        print(f"   ✗ Could not find element [{element_id}]")
-                        print(f"   → Attempting direct keyboard input as fallback...")
+                        log.info(f"   ✗ Could not find element [{element_id}]")
+                        log.info(f"   → Attempting direct keyboard input as fallback...")
 
                         # FALLBACK: If there's a focused field, just type into it
                         has_focused = self.page.evaluate('''
@@ -662,30 +1200,30 @@ class PersistentBrowserAgent:
                         ''')
 
                         if has_focused:
-                            print(f"   ✓ Found focused field, typing directly: '{text}'")
+                            log.info(f"   ✓ Found focused field, typing directly: '{text}'")
                             self.page.keyboard.type(text)
-                            self.wait(500)
-                            self.last_filled_element = None
-                            print(f"   ✓ Direct keyboard input successful")
+                            self._settle_after_input(action)
+                            self._forget_filled_element()
+                            log.info(f"   ✓ Direct keyboard input successful")
                             return True
                         else:
-                            print(f"   ✗ No focused field available for direct input")
+                            log.info(f"   ✗ No focused field available for direct input")
                             return False
 
                 else:
                     # Fallback: Visual-first approach
                     target_text = action.get('target_text', '')
                     target_description = action.get('target_description', '')
-                    print(f"Executing: Fill '{target_text}' with '{text}' (fallback mode)")
+                    log.info(f"Executing: Fill '{target_text}' with '{text}' (fallback mode)")
 
                     locator_str = self.find_element_by_visual_description(target_text, target_description)
                     if not locator_str:
                         selector = action.get('selector')
                         if selector:
-                            print(f"   ⚠️  Falling back to CSS selector: {selector}")
+                            log.info(f"   ⚠️  Falling back to CSS selector: {selector}")
                             locator_str = selector
                         else:
-                            print(f"   ✗ Could not find element")
+                            log.info(f"   ✗ Could not find element")
                             return False
 
                 try:
@@ -703,66 +1241,73 @@ class PersistentBrowserAgent:
                         element = self.page.locator(locator_str).first
 
                     # Special handling: if element isn't fillable, try to find contenteditable child
+                    # (one evaluate answers both "fillable?" and "editable child?")
                     try:
-                        # Test if element is fillable
-                        is_fillable = element.evaluate('el => el.tagName === "INPUT" || el.tagName === "TEXTAREA" || el.hasAttribute("contenteditable")')
-                        if not is_fillable:
-                            # Try to find contenteditable child
-                            contenteditable = element.locator('[contenteditable]').first
-                            if contenteditable.count() > 0:
-                                element = contenteditable
-                                print(f"   → Found contenteditable child")
+                        fill_target = element.evaluate(_FILL_TARGET_JS)
+                        if fill_target == 'child':
+                            element = element.locator('[contenteditable]').first
+                            log.info(f"   → Found contenteditable child")
                     except:
                         pass
 
                     element.fill(text, timeout=10000)
                     # Store the filled element for potential Enter key press
-                    self.last_filled_element = element
-                    print(f"   ✓ Fill successful")
+                    self._forget_filled_element()
+                    try:
+                        self.last_filled_element = element.element_handle(timeout=1000)
+                    except Exception:
+                        self.last_filled_element = None
+                    log.info(f"   ✓ Fill successful")
                     return True
                 except Exception as fill_error:
-                    print(f"   ✗ Fill failed: {str(fill_error)[:100]}")
+                    log.warning(f"   ✗ Fill failed: {str(fill_error)[:100]}")
                     return False
 
             elif action_type == 'press_key':
                 key = action.get('key', 'Enter')
-                print(f"Executing: Press key '{key}'")
+                log.info(f"Executing: Press key '{key}'")
                 try:
                     # If Enter and we have a last filled element, press it on that element
-                    if key == 'Enter' and hasattr(self, 'last_filled_element') and self.last_filled_element:
-                        print(f"   Pressing Enter on last filled element")
-                        self.last_filled_element.press(key)
+                    if key == 'Enter' and self.last_filled_element:
+                        log.info(f"   Pressing Enter on last filled element")
+                        try:
+                            self.last_filled_element.press(key)
+                        except Exception:
+                            # Field was re-rendered since the fill - send it globally
+                            self._forget_filled_element()
+                            self.page.keyboard.press(key)
                     else:
                         # Otherwise send to page globally
                         self.page.keyboard.press(key)
-                    self.wait(1000)
-                    print(f"   ✓ Key press successful")
+                    if settle:
+                        self._settle_after_input(action)
+                    log.info(f"   ✓ Key press successful")
                     return True
                 except Exception as key_error:
-                    print(f"   ✗ Key press failed: {str(key_error)[:100]}")
+                    log.warning(f"   ✗ Key press failed: {str(key_error)[:100]}")
                     return False
 
             elif action_type == 'wait':
                 milliseconds = action.get('milliseconds', 2000)
-                print(f"Executing: Wait {milliseconds}ms")
+                log.info(f"Executing: Wait {milliseconds}ms")
                 self.wait(milliseconds)
                 return True
 
             elif action_type == 'screenshot':
                 description = action.get('description', 'state')
-                print(f"Executing: Screenshot - {description}")
+                log.info(f"Executing: Screenshot - {description}")
                 return True
 
             elif action_type == 'done':
-                print("Executing: Task complete")
+                log.info("Executing: Task complete")
                 return True
 
             else:
-                print(f"Unknown action type: {action_type}")
+                log.info(f"Unknown action type: {action_type}")
                 return False
 
         except Exception as e:
-            print(f"Failed to execute action: {e}")
+            log.warning(f"Failed to execute action: {e}")
             return False
 
     def clear_session(self):
@@ -771,7 +1316,7 @@ class PersistentBrowserAgent:
         if self.session_dir.exists():
             shutil.rmtree(self.session_dir)
             self.session_dir.mkdir(parents=True, exist_ok=True)
-            print(f"🗑️  Session cleared for {self.session_name}")
+            log.info(f"🗑️  Session cleared for {self.session_name}")
 
 
 # Compatibility wrapper to use with existing code
@@ -0,0 +1,185 @@
+"""Pool of warm Chromium browsers - amortizes startup cost across workflows"""
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+import queue
+
+from playwright.sync_api import Browser, BrowserContext, Playwright
+from .browser import _thread_state, get_thread_playwright
+from .config import BROWSER_MAX_USES, BROWSER_POOL_SIZE, CDP_ENDPOINT, CHROMIUM_ARGS, HEADLESS
+from .log import get_logger
+
+log = get_logger(__name__)
+
+
+class BrowserPool:
+    """
+    Keeps launched Chromium browsers warm between workflows.
+
+    Launching Chromium costs 1-3s, while a new BrowserContext on a running
+    browser costs ~50ms and still isolates cookies and storage. Workflows
+    check out a fresh context per run instead of launching a new browser.
+
+    Playwright's sync API binds every object to the thread that created it,
+    so a pool must only be used from one thread. Parallel batches give each
+    worker thread its own pool.
+
+    Each browser is closed and replaced after max_uses checkouts, so memory
+    that Chromium leaks across contexts can't pile up over a long batch.
+
+    With a CDP endpoint the pool attaches to an already-running Chromium
+    instead of launching one, so every agent and worker shares one browser
+    process tree and only gets its own context.
+    """
+
+    def __init__(
+        self,
+        size: int = BROWSER_POOL_SIZE,
+        headless: bool = HEADLESS,
+        max_uses: int = BROWSER_MAX_USES,
+        cdp_endpoint: Optional[str] = CDP_ENDPOINT
+    ):
+        """
+        Initialize the pool (browsers are launched lazily on first use)
+
+        Args:
+            size: Maximum number of browsers kept alive
+            headless: Run browsers in headless mode
+            max_uses: Checkouts before a browser is recycled (0 = never)
+            cdp_endpoint: Attach to this running Chromium instead of launching
+        """
+        self.size = size
+        self.headless = headless
+        # Nothing to recycle when the browser process isn't ours
+        self.max_uses = 0 if cdp_endpoint else max_uses
+        self.cdp_endpoint = cdp_endpoint
+        self.playwright: Optional[Playwright] = None
+        self._browsers: List[Browser] = []
+        self._uses: Dict[Browser, int] = {}
+        self._idle: "queue.Queue[Browser]" = queue.Queue()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False  # Don't suppress exceptions
+
+    def _launch(self) -> Browser:
+        """Launch a new browser and register it with the pool"""
+        if self.playwright is None:
+            self.playwright = get_thread_playwright()
+
+        if self.cdp_endpoint:
+            log.info(f"🔌 Attaching to shared browser at {self.cdp_endpoint}")
+            browser = self.playwright.chromium.connect_over_cdp(self.cdp_endpoint)
+        else:
+            log.info(f"🚀 Launching pooled browser ({len(self._browsers) + 1}/{self.size})")
+            browser = self.playwright.chromium.launch(
+                headless=self.headless, args=list(CHROMIUM_ARGS)
+            )
+        self._browsers.append(browser)
+        return browser
+
+    def _checkout(self) -> Browser:
+        """Take an idle browser, launching one if the pool has room"""
+        while True:
+            try:
+                browser = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if browser.is_connected():
+                return browser
+            # Crashed while idle - forget it and try the next one
+            if browser in self._browsers:
+                self._browsers.remove(browser)
+            self._uses.pop(browser, None)
+
+        if len(self._browsers) < self.size:
+            return self._launch()
+
+        raise RuntimeError(f"All {self.size} pooled browsers are in use")
+
+    def release(self, browser: Browser):
+        """Return a browser to the pool (crashed or worn-out browsers are dropped)"""
+        uses = self._uses.get(browser, 0) + 1
+        self._uses[browser] = uses
+
+        if browser.is_connected() and not (self.max_uses and uses >= self.max_uses):
+            self._idle.put(browser)
+            return
+
+        if browser.is_connected():
+            log.info(f"♻️  Recycling pooled browser after {uses} uses")
+            try:
+                browser.close()
+            except Exception:
+                pass
+        if browser in self._browsers:
+            self._browsers.remove(browser)
+        self._uses.pop(browser, None)
+
+    @contextmanager
+    def acquire(self, storage_state: Optional[Path] = None) -> Iterator[BrowserContext]:
+        """
+        Check out a fresh context on a warm browser
+
+        Args:
+            storage_state: Optional saved cookies/localStorage JSON to preload
+
+        Yields:
+            BrowserContext that is closed when the block exits
+        """
+        browser = self._checkout()
+        try:
+            context = browser.new_context(
+                viewport={'width': 1920, 'height': 1200},
+                device_scale_factor=1,
+                storage_state=str(storage_state) if storage_state and storage_state.exists() else None,
+            )
+            try:
+                yield context
+            finally:
+                context.close()
+        finally:
+            self.release(browser)
+
+    def close(self):
+        """
+        Close every pooled browser (the thread's Playwright driver stays up)
+
+        For CDP-attached browsers close() only disconnects - the shared
+        browser keeps running for other agents.
+        """
+        for browser in self._browsers:
+            try:
+                browser.close()
+            except Exception:
+                pass
+        self._browsers.clear()
+        self._uses.clear()
+        self._idle = queue.Queue()
+        self.playwright = None
+
+
+def get_thread_pool(headless: bool = HEADLESS) -> BrowserPool:
+    """
+    Get the calling thread's shared pool, creating it on first use
+
+    Engines built without an explicit pool check browsers out of this one,
+    so successive workflows on a thread (e.g. repeated run_single_workflow
+    calls) reuse a warm browser instead of launching one per run.
+    stop_thread_playwright closes these pools along with the driver.
+
+    Args:
+        headless: Browser mode (one shared pool per mode)
+
+    Returns:
+        BrowserPool bound to this thread
+    """
+    pools = getattr(_thread_state, 'pools', None)
+    if pools is None:
+        pools = _thread_state.pools = {}
+    if headless not in pools:
+        pools[headless] = BrowserPool(headless=headless)
+    return pools[headless]
@@ -8,10 +8,7 @@ load_dotenv()
 # Paths
 PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
-SCREENSHOTS_DIR = DATA_DIR / "screenshots"
-
-# Ensure directories exist
-SCREENSHOTS_DIR.mkdir(parents=True, exist_ok=True)
+SCREENSHOTS_DIR = DATA_DIR / "screenshots"  # Created on first screenshot, not at import
 
 # API Keys (for later phases)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
@@ -20,6 +17,41 @@ ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 # Browser Settings
 HEADLESS = os.getenv("HEADLESS", "false").lower() == "true"
 BROWSER_TIMEOUT = 30000  # 30 seconds
+SCREENSHOT_JPEG_QUALITY = 60  # Viewport captures are JPEG - much faster to encode than PNG
+
+# Images sent to the LLM are re-encoded: scaled to GPT-4o's own high-detail
+# target (fit in 2048x2048, then short side 768 - 1365x768 for a 1920x1080
+# page, the same 6 tiles the API would bill anyway) and JPEG to cut upload
+# bytes. Going smaller would shrink the drawn SoM labels below legibility.
+LLM_IMAGE_MAX_EDGE = 2048
+LLM_IMAGE_SHORT_EDGE = 768
+LLM_IMAGE_JPEG_QUALITY = 70
+
+# Text-only first pass: a cheap model picks the action from the SoM element
+# list and only asks for the vision model when it needs to see the page
+LLM_TEXT_FIRST = os.getenv("LLM_TEXT_FIRST", "true").lower() == "true"
+LLM_TEXT_MODEL = os.getenv("LLM_TEXT_MODEL", "gpt-4o-mini")
+
+# Browser pool - warm browsers per thread, recycled after N checkouts so a
+# long batch doesn't accumulate renderer memory/leaks in one process
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "1"))
+BROWSER_MAX_USES = int(os.getenv("BROWSER_MAX_USES", "50"))
+# Optional already-running Chromium (e.g. http://localhost:9222) that pooled
+# agents attach to over CDP instead of launching their own browser
+CDP_ENDPOINT = os.getenv("CDP_ENDPOINT")
+# Without CDP_ENDPOINT: launch one CDP-enabled Chromium per process and have
+# parallel batch workers attach to it rather than each launching their own
+SHARED_CDP = os.getenv("AGENT_B_SHARED_CDP", "0") == "1"
+
+# Extra Chromium flags - the agent drives one tab on one origin at a time, so
+# per-origin renderer processes and background throttling are pure overhead
+CHROMIUM_ARGS = (
+    "--disable-features=site-per-process,IsolateOrigins",
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--no-first-run",
+    "--no-default-browser-check",
+)
 
 # App URLs
 APP_URLS = {
@@ -1,42 +1,185 @@
 """LLM-powered agent for intelligent web automation"""
-from typing import Dict, Any, List
+from functools import lru_cache
+from io import BytesIO
+from typing import Dict, Any, List, Optional, Tuple, Union
 import json
 import base64
+import hashlib
+import re
 from pathlib import Path
 
+from PIL import Image
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from .config import OPENAI_API_KEY
+from .config import (
+    OPENAI_API_KEY,
+    LLM_IMAGE_MAX_EDGE,
+    LLM_IMAGE_SHORT_EDGE,
+    LLM_IMAGE_JPEG_QUALITY,
+    LLM_TEXT_FIRST,
+    LLM_TEXT_MODEL,
+)
+from .utils import loads_json
 from .prompts import (
     SYSTEM_PROMPT,
-    QUERY_PARSER_PROMPT,
-    ACTION_DECISION_PROMPT,
-    INITIAL_NAVIGATION_PROMPT,
+    SYSTEM_PROMPT_HASH,
+    render_task,
+    render_query_parser,
+    render_initial_navigation,
+    render_action_decision,
+    render_text_decision,
 )
+from .log import get_logger
+
+log = get_logger(__name__)
+
+
+@lru_cache(maxsize=None)
+def _shared_chat_model(model: str) -> ChatOpenAI:
+    """
+    Get the process-wide chat client for a model
+
+    Every LLMAgent (one per workflow, one per parallel worker) shares it, so
+    requests reuse one pooled set of HTTP connections instead of paying a
+    new TCP/TLS handshake per agent. The underlying client is thread-safe.
+    JSON mode makes the API return a bare JSON object (no ``` fences).
+
+    Args:
+        model: OpenAI model name
+
+    Returns:
+        Shared ChatOpenAI instance
+    """
+    return ChatOpenAI(
+        model=model,
+        openai_api_key=OPENAI_API_KEY,
+        max_tokens=1024,
+        temperature=0.7,
+        max_retries=2,
+        model_kwargs={"response_format": {"type": "json_object"}},
+        # Raw request-body field, so it works with any openai SDK version
+        extra_body={"prompt_cache_key": SYSTEM_PROMPT_HASH},
+    )
+
+# A ```json ... ``` wrapper, in case a model ignores JSON mode
+_JSON_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+
+
+def _parse_json_response(content: str) -> Any:
+    """
+    Parse an LLM response as JSON
+
+    JSON mode returns a bare object, so the fence strip only runs if the
+    direct parse fails. Uses orjson when installed - its JSONDecodeError
+    subclasses the stdlib one, so callers catch either.
+
+    Args:
+        content: Raw response text
+
+    Returns:
+        Parsed JSON value
+
+    Raises:
+        json.JSONDecodeError: If the content isn't JSON even without fences
+    """
+    try:
+        return loads_json(content)
+    except json.JSONDecodeError:
+        return loads_json(_JSON_FENCE_RE.sub("", content))
+
+
+_EMPTY_HISTORY = "None yet (this is the first action)"
+
+# Actions the text-only pass may return without the vision model
+_TEXT_ACTIONS = ('click', 'fill', 'press_key', 'wait')
+
+
+def _format_element_list(element_mapping: Dict[int, Dict]) -> str:
+    """Render the SoM mapping as numbered '[id] role: "label"' lines"""
+    lines = ["Available elements (numbered in screenshot):"]
+    for elem_id, elem_data in element_mapping.items():
+        text = elem_data.get('text', '')[:50]
+        role = elem_data.get('role', 'element')
+        aria = elem_data.get('ariaLabel', '')[:30]
+
+        if text:
+            lines.append(f"  [{elem_id}] {role}: \"{text}\"")
+        elif aria:
+            lines.append(f"  [{elem_id}] {role}: \"{aria}\"")
+        else:
+            lines.append(f"  [{elem_id}] {role}")
+    return "\n".join(lines)
+
+
+def _encode_screenshot(screenshot: Union[Path, bytes, Image.Image]) -> str:
+    """
+    Downscale and JPEG-encode a screenshot for the vision model, in memory
+
+    Args:
+        screenshot: Screenshot file, raw image bytes, or an in-memory image
+            (e.g. the annotated image) - the last two skip the disk read
+
+    Returns:
+        data: URL with the base64 JPEG
+    """
+    if isinstance(screenshot, Image.Image):
+        img = screenshot.convert("RGB")  # Always a copy - caller's image is untouched
+    else:
+        source = BytesIO(screenshot) if isinstance(screenshot, bytes) else screenshot
+        with Image.open(source) as opened:
+            img = opened.convert("RGB")
+    # Same resize the API applies server-side, never below it - the SoM
+    # marks were drawn at full size and must stay readable
+    scale = min(1.0, LLM_IMAGE_MAX_EDGE / max(img.size), LLM_IMAGE_SHORT_EDGE / min(img.size))
+    if scale < 1.0:
+        img = img.resize((round(img.width * scale), round(img.height * scale)), Image.LANCZOS)
+    buffer = BytesIO()
+    img.save(buffer, format="JPEG", quality=LLM_IMAGE_JPEG_QUALITY)
+    image_data = base64.b64encode(buffer.getvalue()).decode('utf-8')
+    return f"data:image/jpeg;base64,{image_data}"
+
+
+def _screenshot_digest(screenshot: Union[Path, bytes, Image.Image]) -> bytes:
+    """Content hash of a screenshot - identical pixels give the same digest"""
+    if isinstance(screenshot, Image.Image):
+        data = screenshot.tobytes()
+    elif isinstance(screenshot, bytes):
+        data = screenshot
+    else:
+        data = Path(screenshot).read_bytes()
+    return hashlib.blake2b(data, digest_size=16).digest()
 
 
 class LLMAgent:
     """LLM-powered agent for decision making using GPT-4 Vision"""
 
-    def __init__(self, model: str = "gpt-4o"):
-        """Initialize LLM agent with GPT-4"""
+    def __init__(self, model: str = "gpt-4o", text_first: bool = LLM_TEXT_FIRST):
+        """
+        Initialize LLM agent with GPT-4
+
+        Args:
+            model: Vision model name
+            text_first: Try a cheap text-only decision from the SoM element
+                list before sending the screenshot to the vision model
+        """
         if not OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY not found in environment")
 
-        self.llm = ChatOpenAI(
-            model=model,
-            openai_api_key=OPENAI_API_KEY,
-            max_tokens=1024,
-            temperature=0.7,
-        )
+        self.llm = _shared_chat_model(model)
+        self.text_llm = _shared_chat_model(LLM_TEXT_MODEL) if text_first else None
         self.action_history: List[Dict] = []
+        # Prompt text for the last 5 actions, rebuilt only when history grows
+        self._history_str = _EMPTY_HISTORY
+        # (digest, data URL) of the last encoded screenshot - a retry on an
+        # unchanged page skips the resize + JPEG + base64 work
+        self._image_cache: Optional[Tuple[bytes, str]] = None
 
     def parse_query(self, query: str) -> Dict[str, Any]:
         """Parse user query to extract app and task"""
-        print(f"\nParsing query: {query}")
+        log.info(f"\nParsing query: {query}")
 
-        prompt = QUERY_PARSER_PROMPT.format(query=query)
+        prompt = render_query_parser(query=query)
 
         messages = [
             SystemMessage(content="You are a query parser. Respond only with valid JSON."),
@@ -46,21 +189,12 @@ class LLMAgent:
         response = self.llm.invoke(messages)
 
         try:
-            content = response.content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
-
-            parsed = json.loads(content)
-            print(f"Parsed: app={parsed['app']}, task={parsed['task']}")
+            parsed = _parse_json_response(response.content)
+            log.info(f"Parsed: app={parsed['app']}, task={parsed['task']}")
             return parsed
         except json.JSONDecodeError as e:
-            print(f"Failed to parse LLM response: {e}")
-            print(f"Response was: {response.content}")
+            log.warning(f"Failed to parse LLM response: {e}")
+            log.warning(f"Response was: {response.content}")
             return {
                 "app": "unknown",
                 "task": query,
@@ -70,59 +204,58 @@ class LLMAgent:
     def decide_action(
         self,
         task: str,
-        screenshot_path: Path,
+        screenshot_path: Union[Path, bytes, Image.Image],
         state_info: Dict[str, Any],
         is_initial: bool = False,
         interactive_elements: List[Dict[str, Any]] = None,
         element_mapping: Dict[int, Dict] = None
     ) -> Dict[str, Any]:
-        """Decide next action based on screenshot, state, and available elements"""
-        print(f"\nDeciding next action for: {task}")
+        """
+        Decide next action based on screenshot, state, and available elements
 
-        with open(screenshot_path, 'rb') as f:
-            image_data = base64.b64encode(f.read()).decode('utf-8')
+        screenshot_path may also be raw screenshot bytes or an in-memory image,
+        which avoids writing and re-reading a file per decision.
+        """
+        log.info(f"\nDeciding next action for: {task}")
 
-        history_str = "\n".join([
-            f"- {i+1}. {action['action']}: {action.get('description', 'N/A')}"
-            for i, action in enumerate(self.action_history[-5:])
-        ]) or "None yet (this is the first action)"
+        # The first step needs the initial-navigation instructions (app and
+        # start-of-task guidance), which only the vision prompt carries
+        if self.text_llm and element_mapping and not is_initial:
+            action = self.decide_action_text(task, state_info, element_mapping)
+            if action:
+                return action
+
+        digest = _screenshot_digest(screenshot_path)
+        if self._image_cache and self._image_cache[0] == digest:
+            image_url = self._image_cache[1]
+        else:
+            image_url = _encode_screenshot(screenshot_path)
+            self._image_cache = (digest, image_url)
 
         # SoM: Build element list from mapping
-        element_list_str = ""
-        if element_mapping:
-            lines = ["Available elements (numbered in screenshot):"]
-            for elem_id, elem_data in element_mapping.items():
-                text = elem_data.get('text', '')[:50]
-                role = elem_data.get('role', 'element')
-                aria = elem_data.get('ariaLabel', '')[:30]
-
-                if text:
-                    lines.append(f"  [{elem_id}] {role}: \"{text}\"")
-                elif aria:
-                    lines.append(f"  [{elem_id}] {role}: \"{aria}\"")
-                else:
-                    lines.append(f"  [{elem_id}] {role}")
-            element_list_str = "\n" + "\n".join(lines)
+        element_list_str = "\n" + _format_element_list(element_mapping) if element_mapping else ""
 
         if is_initial:
-            prompt = INITIAL_NAVIGATION_PROMPT.format(
-                task=task,
+            prompt = render_initial_navigation(
                 app=state_info.get('app', 'unknown'),
                 url=state_info.get('url', 'unknown'),
             ) + element_list_str
         else:
-            prompt = ACTION_DECISION_PROMPT.format(
-                task=task,
+            prompt = render_action_decision(
                 url=state_info.get('url', 'unknown'),
                 title=state_info.get('title', 'unknown'),
-                action_history=history_str,
+                action_history=self._history_str,
                 has_modal=state_info.get('has_modal', False),
                 has_dropdown=state_info.get('has_dropdown', False),
                 element_count=state_info.get('element_count', 0),
             ) + element_list_str
 
+        # Static prefix first (system prompt, then the task) so OpenAI's
+        # automatic prompt caching reuses it; per-turn state and the
+        # screenshot go in the last message
         messages = [
             SystemMessage(content=SYSTEM_PROMPT),
+            HumanMessage(content=render_task(task=task)),
             HumanMessage(content=[
                 {
                     "type": "text",
@@ -131,7 +264,7 @@ class LLMAgent:
                 {
                     "type": "image_url",
                     "image_url": {
-                        "url": f"data:image/png;base64,{image_data}",
+                        "url": image_url,
                         "detail": "high"
                     },
                 },
@@ -141,27 +274,21 @@ class LLMAgent:
         response = self.llm.invoke(messages)
 
         try:
-            content = response.content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
-
-            action = json.loads(content)
+            action = _parse_json_response(response.content)
+            if 'action' not in action and isinstance(action.get('actions'), list):
+                action = self._normalize_batch(action)
 
-            print(f"Decision: {action['action']}")
-            print(f"   Reasoning: {action.get('reasoning', 'N/A')[:100]}...")
+            log.info(f"Decision: {action['action']}")
+            log.info(f"   Reasoning: {action.get('reasoning', 'N/A')[:100]}...")
 
-            self.action_history.append(action)
+            # History lists the individual steps of a batch
+            self._record_history(action['actions'] if action['action'] == 'batch' else [action])
 
             return action
 
         except json.JSONDecodeError as e:
-            print(f"Failed to parse action: {e}")
-            print(f"Response was: {response.content}")
+            log.warning(f"Failed to parse action: {e}")
+            log.warning(f"Response was: {response.content}")
 
             return {
                 "action": "wait",
@@ -170,7 +297,100 @@ class LLMAgent:
                 "reasoning": "Error in LLM output, waiting to retry"
             }
 
+    def decide_action_text(
+        self,
+        task: str,
+        state_info: Dict[str, Any],
+        element_mapping: Dict[int, Dict]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Cheap text-only decision from the SoM element list (no screenshot)
+
+        Most steps ("click the New issue button") are obvious from element
+        labels alone, so a small model on a few hundred text tokens can pick
+        them; it answers "need_vision" when it has to see the page.
+
+        Args:
+            task: Task description
+            state_info: Current page state (url, title, has_modal)
+            element_mapping: SoM mapping of the numbered elements
+
+        Returns:
+            The action, or None to fall back to the vision model
+        """
+        prompt = render_text_decision(
+            url=state_info.get('url', 'unknown'),
+            title=state_info.get('title', 'unknown'),
+            has_modal=state_info.get('has_modal', False),
+            action_history=self._history_str,
+            element_list=_format_element_list(element_mapping),
+        )
+        messages = [
+            SystemMessage(content=SYSTEM_PROMPT),
+            HumanMessage(content=render_task(task=task)),
+            HumanMessage(content=prompt),
+        ]
+
+        try:
+            action = _parse_json_response(self.text_llm.invoke(messages).content)
+        except Exception as e:
+            log.warning(f"Text-only decision failed ({e}), using vision")
+            return None
+
+        # Batches, completion and unknown element ids all need the screenshot
+        if not isinstance(action, dict) or action.get('action') not in _TEXT_ACTIONS:
+            log.info("Text-only pass needs vision")
+            return None
+        if action['action'] in ('click', 'fill') and action.get('element_id') not in element_mapping:
+            log.info("Text-only pass picked an unknown element, using vision")
+            return None
+
+        log.info(f"Decision (text-only): {action['action']}")
+        log.info(f"   Reasoning: {action.get('reasoning', 'N/A')[:100]}...")
+        self._record_history([action])
+        return action
+
+    def _normalize_batch(self, decision: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Turn an {"actions": [...]} response into a single 'batch' action
+
+        Args:
+            decision: Parsed LLM response with an "actions" list
+
+        Returns:
+            A 'batch' action, the lone step if only one remains, or 'done'
+            if the batch only declared completion
+        """
+        steps = [
+            step for step in decision['actions']
+            if isinstance(step, dict) and step.get('action') not in (None, 'done')
+        ]
+        if not steps:
+            done = any(isinstance(step, dict) and step.get('action') == 'done' for step in decision['actions'])
+            steps = [{"action": "done" if done else "wait", "milliseconds": 2000}]
+        if len(steps) == 1:
+            merged = {key: value for key, value in decision.items() if key != 'actions'}
+            return {**merged, **steps[0]}
+
+        return {
+            "action": "batch",
+            "actions": steps,
+            "description": decision.get('description') or "; ".join(
+                step.get('description', step['action']) for step in steps
+            ),
+            "reasoning": decision.get('reasoning', 'N/A'),
+        }
+
+    def _record_history(self, actions: List[Dict[str, Any]]):
+        """Append decided actions and refresh the cached 5-action window"""
+        self.action_history.extend(actions)
+        self._history_str = "\n".join(
+            f"- {i+1}. {action['action']}: {action.get('description', 'N/A')}"
+            for i, action in enumerate(self.action_history[-5:])
+        )
+
     def reset_history(self):
         """Clear action history"""
         self.action_history = []
-        print("Action history cleared")
+        self._history_str = _EMPTY_HISTORY
+        log.info("Action history cleared")
@@ -0,0 +1,78 @@
+"""Shared logger for agent modules - replaces ad-hoc print() calls"""
+from logging.handlers import QueueHandler, QueueListener
+import atexit
+import logging
+import queue
+import sys
+import threading
+
+_ROOT_NAME = "agentb"
+
+_listener: "QueueListener | None" = None
+_listener_lock = threading.Lock()
+
+
+def _configure_root() -> logging.Logger:
+    """
+    Set up the package logger once (plain messages to stdout, like print)
+
+    Log calls format the record (QueueHandler.prepare runs in the calling
+    thread) and put it on a queue; a background listener thread does the
+    stdout writes, so the hot loop never blocks on terminal I/O. The
+    listener is drained and stopped at exit; call flush() before print()
+    or input() so their output isn't interleaved with queued records.
+    """
+    global _listener
+    root = logging.getLogger(_ROOT_NAME)
+    if not root.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        _listener = QueueListener(log_queue, handler)
+        _listener.start()
+        atexit.register(_stop_listener)
+
+        root.addHandler(QueueHandler(log_queue))
+        root.setLevel(logging.INFO)
+        # Keep messages out of any root handlers the host app configured
+        root.propagate = False
+    return root
+
+
+def _stop_listener():
+    """Drain the queue and stop the listener thread (idempotent)"""
+    with _listener_lock:
+        if _listener is not None and _listener._thread is not None:
+            _listener.stop()
+
+
+def flush():
+    """
+    Block until every record logged so far has been written to stdout
+
+    Stopping the listener enqueues a sentinel behind the pending records and
+    joins the thread once they are written; it is then restarted. Records
+    logged meanwhile simply wait on the queue.
+    """
+    with _listener_lock:
+        if _listener is not None and _listener._thread is not None:
+            _listener.stop()
+            _listener.start()
+    sys.stdout.flush()
+
+
+_configure_root()
+
+
+def get_logger(module_name: str) -> logging.Logger:
+    """
+    Get a child of the package logger for a module
+
+    Args:
+        module_name: The module's __name__ (e.g. "src.auth_manager")
+
+    Returns:
+        Logger named "agentb.<module>" regardless of how the package was imported
+    """
+    return logging.getLogger(f"{_ROOT_NAME}.{module_name.rsplit('.', 1)[-1]}")
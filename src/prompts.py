@@ -1,4 +1,7 @@
 """Prompts for LLM agent decision making"""
+import hashlib
+import string
+from typing import Callable
 
 SYSTEM_PROMPT = """You are an expert web automation assistant using SET-OF-MARKS (SoM) navigation.
 
@@ -11,6 +14,7 @@ Respond ONLY with valid JSON:
   "element_id": number (the red box number from screenshot),
   "text": "text to type (for fill actions only)",
   "key": "key to press (for press_key actions only)",
+  "wait_for": "visible text you expect to appear after this action (optional)",
   "description": "brief description of what you're doing",
   "reasoning": "why you chose this action"
 }
@@ -22,6 +26,18 @@ Action types:
 - wait: Wait for page to load → specify milliseconds
 - done: Task complete → ONLY when you see confirmation!
 
+BATCHING: When several steps need no new screenshot in between (e.g. fill a
+field, then press Enter), return them together in one response:
+{
+  "actions": [
+    {"action": "fill", "element_id": 12, "text": "Q3 Roadmap"},
+    {"action": "press_key", "key": "Enter"}
+  ],
+  "description": "brief description of the whole batch",
+  "reasoning": "why these steps can run together"
+}
+Only batch elements visible in THIS screenshot. Never put "done" in a batch.
+
 CRITICAL RULES:
 1. If you see a blocking popup/modal → dismiss it first (look for X, "Got it", "OK", "Close")
 
@@ -42,6 +58,10 @@ CRITICAL RULES:
 
 The numbers make disambiguation easy - just pick the right number!"""
 
+# Stable id for the system prompt - sent as OpenAI's prompt_cache_key so
+# requests sharing this prefix are routed to the same prompt cache
+SYSTEM_PROMPT_HASH = hashlib.blake2b(SYSTEM_PROMPT.encode(), digest_size=8).hexdigest()
+
 QUERY_PARSER_PROMPT = """Parse this user query and extract the app name and task description.
 
 Query: {query}
@@ -59,9 +79,12 @@ Instructions:
 - Extract the core task/action the user wants to perform
 - Identify 2-4 keywords that describe the task"""
 
+# Sent right after SYSTEM_PROMPT and identical on every turn of a task, so the
+# per-turn prompts below only carry state that changes (keeps the cached prefix stable)
+TASK_PROMPT = """Your task: {task}"""
+
 INITIAL_NAVIGATION_PROMPT = """You are starting a new task. Analyze the screenshot and decide the FIRST action to take.
 
-Task: {task}
 App: {app}
 Current URL: {url}
 
@@ -75,7 +98,6 @@ Remember: Respond ONLY with valid JSON."""
 
 ACTION_DECISION_PROMPT = """Continue working on the task. Analyze the screenshot and decide the NEXT action.
 
-Task: {task}
 Current URL: {url}
 Page Title: {title}
 
@@ -98,3 +120,51 @@ Current state:
 - Other tasks: Mark "done" when you see confirmation
 
 Remember: Respond ONLY with valid JSON."""
+
+TEXT_DECISION_PROMPT = """Decide the NEXT action WITHOUT a screenshot - you only get the page's numbered interactive elements.
+
+Current URL: {url}
+Page Title: {title}
+Modal open: {has_modal}
+
+Previous actions taken:
+{action_history}
+
+{element_list}
+
+If the element list is enough to pick the next step confidently (a clearly labelled button, link or field, or a popup to dismiss), respond with the action JSON as usual.
+If you need to SEE the page (layout, several similar elements, checking whether the task is complete), respond with {{"action": "need_vision"}} instead.
+Never return "done" here - completion must be confirmed on the screenshot.
+
+Remember: Respond ONLY with valid JSON."""
+
+
+def _compile_template(template: str) -> Callable[..., str]:
+    """
+    Pre-parse a str.format template once at import
+
+    Args:
+        template: Template using plain {name} fields (no conversions/specs)
+
+    Returns:
+        render(**fields) equivalent to template.format(**fields)
+    """
+    parts = [
+        (literal, field_name)
+        for literal, field_name, _, _ in string.Formatter().parse(template)
+    ]
+
+    def render(**fields) -> str:
+        return "".join(
+            literal + (str(fields[field_name]) if field_name is not None else "")
+            for literal, field_name in parts
+        )
+
+    return render
+
+
+render_task = _compile_template(TASK_PROMPT)
+render_query_parser = _compile_template(QUERY_PARSER_PROMPT)
+render_initial_navigation = _compile_template(INITIAL_NAVIGATION_PROMPT)
+render_action_decision = _compile_template(ACTION_DECISION_PROMPT)
+render_text_decision = _compile_template(TEXT_DECISION_PROMPT)
@@ -11,44 +11,40 @@ Usage:
 """
 import sys
 import argparse
+import re
 from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src.browser import PersistentBrowserAgent
-from src.workflow_engine import WorkflowEngine
+# Apps with saved sessions, matched as whole words anywhere in the query
+_APP_SESSION_RE = re.compile(r'\b(asana|linear|notion|github|trello)\b', re.IGNORECASE)
 
 
 def run_single_workflow(query: str, use_session: bool = True, headless: bool = False):
     """Run a single workflow with session support"""
+    from functools import partial
+
+    # Imported here so --help doesn't pay for loading Playwright
+    from src.browser import BrowserAgent, PersistentBrowserAgent
+    from src.workflow_engine import WorkflowEngine
     
     print(f"\n🚀 Running workflow: {query}")
     
     # Parse the app from query (simple approach)
-    app_keywords = {
-        'asana': 'asana',
-        'linear': 'linear', 
-        'notion': 'notion',
-        'github': 'github',
-        'trello': 'trello',
-    }
-    
-    session_name = 'default'
-    for keyword, app in app_keywords.items():
-        if keyword in query.lower():
-            session_name = app
-            print(f"📌 Using session: {session_name}")
-            break
+    match = _APP_SESSION_RE.search(query)
+    session_name = match.group(1).lower() if match else 'default'
+    if match:
+        print(f"📌 Using session: {session_name}")
     
-    # Create workflow engine with persistent browser
+    # Create workflow engine with the app's persistent session
     if use_session:
-        # Import the workflow engine and monkey-patch it to use persistent browser
-        from src import workflow_engine as we_module
-        we_module.BrowserAgent = PersistentBrowserAgent
+        browser_cls = partial(PersistentBrowserAgent, session_name=session_name)
+    else:
+        browser_cls = BrowserAgent
     
     # Run the workflow
-    engine = WorkflowEngine(headless=headless, max_steps=15)
+    engine = WorkflowEngine(headless=headless, max_steps=15, browser_cls=browser_cls)
     result = engine.execute_workflow(query)
     
     # Print results
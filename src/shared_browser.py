@@ -0,0 +1,50 @@
+"""One CDP-enabled Chromium per process that parallel workers attach to"""
+from typing import Optional, Tuple
+import socket
+import threading
+
+from playwright.sync_api import Browser
+from .browser import get_thread_playwright
+from .config import CHROMIUM_ARGS, HEADLESS
+from .log import get_logger
+
+log = get_logger(__name__)
+
+_lock = threading.Lock()
+# (browser, endpoint URL) - the browser belongs to the thread that launched it
+_shared: Optional[Tuple[Browser, str]] = None
+
+
+def _free_port() -> int:
+    """Ask the OS for an unused local TCP port"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get_shared_cdp_url(headless: bool = HEADLESS) -> str:
+    """
+    Get the CDP endpoint of the process-wide shared browser, launching it once
+
+    Workers pass the URL to BrowserPool(cdp_endpoint=...), so one Chromium
+    process tree serves every worker, each in its own context. Call this
+    from the thread that should own the browser (e.g. the main thread
+    before starting workers); it is stopped with that thread's Playwright.
+
+    Args:
+        headless: Launch the shared browser headless
+
+    Returns:
+        http://127.0.0.1:<port> endpoint for connect_over_cdp
+    """
+    global _shared
+    with _lock:
+        if _shared is None or not _shared[0].is_connected():
+            port = _free_port()
+            log.info(f"🌐 Launching shared browser (CDP port {port})")
+            browser = get_thread_playwright().chromium.launch(
+                headless=headless,
+                args=[*CHROMIUM_ARGS, f"--remote-debugging-port={port}"],
+            )
+            _shared = (browser, f"http://127.0.0.1:{port}")
+        return _shared[1]
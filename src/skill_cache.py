@@ -0,0 +1,101 @@
+"""Record-and-replay cache of successful workflows - skips the LLM loop on repeats"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import hashlib
+import os
+import threading
+
+from .config import DATA_DIR
+from .utils import dumps_json, loads_json
+from .log import get_logger
+
+log = get_logger(__name__)
+
+SKILLS_DIR = DATA_DIR / "skills"
+
+# Action fields worth replaying (element_id is replaced by the element itself)
+_STEP_KEYS = ('action', 'text', 'key', 'wait_for', 'description')
+
+# SoM element fields the locator resolver matches on
+_ELEMENT_KEYS = ('text', 'ariaLabel', 'role', 'selector')
+
+
+def skill_key(app: str, task: str) -> str:
+    """Stable cache key for a task on an app (case/whitespace-insensitive)"""
+    normalized = " ".join(task.lower().split())
+    return hashlib.blake2b(f"{app}:{normalized}".encode(), digest_size=16).hexdigest()
+
+
+def skill_step(action: Dict[str, Any], element_mapping: Optional[Dict[int, Dict]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Turn an executed action into a replayable step
+
+    SoM element ids are only valid for one screenshot, so the step stores
+    the element's text/label/role/selector instead of its id.
+
+    Args:
+        action: Action that executed successfully
+        element_mapping: SoM mapping the action's element_id refers to
+
+    Returns:
+        Step dict, or None for actions not worth replaying (wait, done, ...)
+    """
+    if action.get('action') not in ('click', 'fill', 'press_key'):
+        return None
+
+    step = {key: action[key] for key in _STEP_KEYS if key in action}
+    element = (element_mapping or {}).get(action.get('element_id'))
+    if element:
+        step['element'] = {key: element.get(key, '') for key in _ELEMENT_KEYS}
+    elif action['action'] != 'press_key':
+        return None  # Nothing to find the target by on replay
+    return step
+
+
+class SkillCache:
+    """
+    Stores the action script of each successful workflow as JSON.
+
+    A repeat of the same task on the same app replays the script directly
+    (no screenshots or LLM calls); the engine falls back to the normal loop
+    if any step fails.
+    """
+
+    def __init__(self, skills_dir: Path = SKILLS_DIR):
+        """
+        Initialize the cache
+
+        Args:
+            skills_dir: Directory holding one <key>.json per skill
+        """
+        self.skills_dir = skills_dir
+
+    def _path(self, app: str, task: str) -> Path:
+        return self.skills_dir / f"{skill_key(app, task)}.json"
+
+    def load(self, app: str, task: str) -> Optional[List[Dict[str, Any]]]:
+        """Get the recorded steps for a task, or None if there are none"""
+        try:
+            return loads_json(self._path(app, task).read_bytes())['steps']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, app: str, task: str, steps: List[Dict[str, Any]]):
+        """Record the steps of a successful run (written atomically)"""
+        if not steps:
+            return
+        self.skills_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(app, task)
+        # Per-thread temp file: parallel workers (threads of one process) may
+        # finish the same task - each swaps in a complete file, last one wins
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(dumps_json({'app': app, 'task': task, 'steps': steps}))
+        os.replace(tmp_path, path)
+        log.info(f"💾 Saved skill ({len(steps)} steps) for replay")
+
+    def invalidate(self, app: str, task: str):
+        """Drop a skill that no longer replays"""
+        try:
+            self._path(app, task).unlink()
+        except OSError:
+            pass
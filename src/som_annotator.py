@@ -1,8 +1,33 @@
 """Set-of-Marks (SoM) screenshot annotator for visual grounding"""
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Any, Tuple
 from PIL import Image, ImageDraw, ImageFont
-import json
+import math
+
+from .utils import dumps_json
+
+_LABEL_FONT_PATH = "/System/Library/Fonts/Helvetica.ttc"
+_LABEL_FONT_SIZE = 16
+
+# Fields kept per element in the SoM mapping
+_MAPPING_KEYS = frozenset(('text', 'role', 'type', 'position', 'selector', 'ariaLabel'))
+
+
+@lru_cache(maxsize=4)
+def _get_font(path: str, size: int) -> ImageFont.ImageFont:
+    """Load a label font once per process (falls back to Pillow's default)"""
+    try:
+        return ImageFont.truetype(path, size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=4)
+def _digit_widths(path: str, size: int) -> Tuple[int, ...]:
+    """Rendered width of each digit 0-9 - labels are integers"""
+    font = _get_font(path, size)
+    return tuple(math.ceil(font.getlength(str(digit))) for digit in range(10))
 
 
 class SoMAnnotator:
@@ -39,18 +64,38 @@ class SoMAnnotator:
         """
         # Load screenshot
         img = Image.open(screenshot_path)
-        draw = ImageDraw.Draw(img, 'RGBA')
+        element_mapping = self.annotate_image(img, elements)
 
-        # Try to load a font, fallback to default
-        try:
-            # Try to use a clear font
-            font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 16)
-        except:
-            font = ImageFont.load_default()
+        if output_path is None:
+            output_path = screenshot_path.parent / f"{screenshot_path.stem}_annotated.png"
+        self.save_annotation(img, element_mapping, output_path)
+
+        return output_path, element_mapping
+
+    def annotate_image(
+        self,
+        img: Image.Image,
+        elements: List[Dict[str, Any]]
+    ) -> Dict[int, Dict]:
+        """
+        Draw numbered marks onto an in-memory screenshot (modified in place).
+
+        Args:
+            img: Screenshot image, e.g. decoded from Playwright's screenshot bytes
+            elements: List of interactive elements with positions
+
+        Returns:
+            element_mapping: {1: element_data, 2: element_data, ...}
+        """
+        font = _get_font(_LABEL_FONT_PATH, _LABEL_FONT_SIZE)
+        digit_widths = _digit_widths(_LABEL_FONT_PATH, _LABEL_FONT_SIZE)
 
         # Create element mapping
         element_mapping = {}
 
+        # (box, label background, label text position, label) per mark
+        marks = []
+
         # Annotate each element
         label_id = 0  # Separate counter for visual labels
         for idx, elem in enumerate(elements, start=1):
@@ -67,60 +112,79 @@ class SoMAnnotator:
             # Increment label counter only for valid elements
             label_id += 1
 
-            # Draw bounding box around element
+            # Bounding box around element
             box_coords = [x, y, x + width, y + height]
-            draw.rectangle(box_coords, outline=self.box_color, width=2)
 
-            # Draw numbered label
+            # Numbered label
             label = str(label_id)
 
-            # Create a background box for the number
-            # Get text size (approximate for default font)
-            text_width = len(label) * 10 + 6
+            # Create a background box for the number (3px padding each side)
+            text_width = sum(digit_widths[int(digit)] for digit in label) + 6
             text_height = 20
 
             label_x = x
             label_y = max(0, y - text_height - 2)  # Place above element
 
-            # Draw label background
+            # Label background
             label_box = [
                 label_x,
                 label_y,
                 label_x + text_width,
                 label_y + text_height
             ]
+            marks.append((box_coords, label_box, (label_x + 3, label_y + 2), label))
+
+            # Store in mapping using label_id (not idx). Elements from
+            # get_elements_with_positions already have exactly these fields,
+            # so they're referenced rather than copied
+            if elem.keys() == _MAPPING_KEYS:
+                element_mapping[label_id] = elem
+            else:
+                element_mapping[label_id] = {
+                    'text': elem.get('text', ''),
+                    'role': elem.get('role', ''),
+                    'type': elem.get('type', ''),
+                    'position': pos,
+                    'selector': elem.get('selector', ''),
+                    'ariaLabel': elem.get('ariaLabel', '')
+                }
+
+        # Shapes first, then the digits, so no label is covered by a later
+        # element's box
+        draw = ImageDraw.Draw(img, 'RGBA')
+        for box_coords, label_box, _, _ in marks:
+            draw.rectangle(box_coords, outline=self.box_color, width=2)
             draw.rectangle(label_box, fill=(*self.box_color, self.opacity))
+        for _, _, text_xy, label in marks:
+            draw.text(text_xy, label, fill=self.text_color, font=font)
 
-            # Draw label text
-            draw.text(
-                (label_x + 3, label_y + 2),
-                label,
-                fill=self.text_color,
-                font=font
-            )
-
-            # Store in mapping using label_id (not idx)
-            element_mapping[label_id] = {
-                'text': elem.get('text', ''),
-                'role': elem.get('role', ''),
-                'type': elem.get('type', ''),
-                'position': pos,
-                'selector': elem.get('selector', ''),
-                'ariaLabel': elem.get('ariaLabel', '')
-            }
-
-        # Save annotated image
-        if output_path is None:
-            output_path = screenshot_path.parent / f"{screenshot_path.stem}_annotated.png"
+        return element_mapping
 
-        img.save(output_path)
+    def save_annotation(
+        self,
+        img: Image.Image,
+        element_mapping: Dict[int, Dict],
+        output_path: Path
+    ):
+        """
+        Save an annotated image and its element mapping JSON next to it.
+
+        Args:
+            img: Annotated image
+            element_mapping: Mapping from annotate_image
+            output_path: Where to save the annotated image
+        """
+        # The annotated copy is a dataset artifact (the LLM gets the image
+        # in memory), so favour encode speed over size: zlib level 1 instead
+        # of Pillow's default 6
+        if output_path.suffix.lower() == '.png':
+            img.save(output_path, compress_level=1)
+        else:
+            img.save(output_path)
 
         # Also save the mapping as JSON
         mapping_path = output_path.parent / f"{output_path.stem}_mapping.json"
-        with open(mapping_path, 'w') as f:
-            json.dump(element_mapping, f, indent=2)
-
-        return output_path, element_mapping
+        mapping_path.write_bytes(dumps_json(element_mapping))
 
     def create_element_list_text(self, element_mapping: Dict[int, Dict]) -> str:
         """
@@ -1,7 +1,153 @@
 """State detection for identifying when to capture screenshots"""
+from functools import lru_cache
 from playwright.sync_api import Page
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import time
+import weakref
+
+from .log import get_logger
+
+log = get_logger(__name__)
+
+
+# Everything get_current_state_info reports, in one round-trip: the DOM
+# snapshot counts, visible modal/dropdown checks, and (with summary=true)
+# the page summary the enhanced workflow engine adds to its state
+_STATE_INFO_JS = """
+(summary) => {
+    const isShown = el => {
+        const style = window.getComputedStyle(el);
+        return style.display !== 'none' && style.visibility !== 'hidden';
+    };
+    const info = {
+        url: window.location.href,
+        title: document.title,
+        element_count: document.querySelectorAll('*').length,
+        modal_count: document.querySelectorAll('[role="dialog"], .modal, [class*="modal"]').length,
+        form_count: document.querySelectorAll('form, [role="form"]').length,
+        button_count: document.querySelectorAll('button, [role="button"]').length,
+        has_modal: Array.from(document.querySelectorAll(
+            '[role="dialog"], .modal, [class*="modal"], [class*="dialog"]'
+        )).some(isShown),
+        has_dropdown: Array.from(document.querySelectorAll(
+            '[role="menu"], [role="listbox"], .dropdown-menu, [class*="dropdown"][class*="open"]'
+        )).some(isShown),
+    };
+    if (!summary) return info;
+
+    info.interactive_elements = document.querySelectorAll(
+        'button, a, input, textarea, select, [role="button"], [onclick]'
+    ).length;
+    info.has_forms = info.form_count > 0 ||
+        document.querySelectorAll('input, textarea, select').length > 2;
+
+    const successSelector = '[class*="success"], [class*="toast"], [class*="alert"], ' +
+        '[role="alert"], [class*="notification"]';
+    const bodyText = document.body ? document.body.innerText.toLowerCase() : '';
+    info.has_success_indicator = !!document.querySelector(successSelector) ||
+        ['success', 'created', 'saved', 'completed', 'done'].some(word => bodyText.includes(word));
+
+    info.visible_text_summary = Array.from(document.querySelectorAll('h1, h2, h3, button, [role="button"]'))
+        .map(el => el.innerText?.trim())
+        .filter(text => text && text.length > 0)
+        .slice(0, 10)
+        .join(' | ')
+        .slice(0, 200);
+    return info;
+}
+"""
+
+# Marks window.__domState dirty and bumps its version on any DOM mutation
+# (including class/style changes, which can show or hide a modal) and on
+# root/body resizes (late images, fonts or CSS reflowing the page without a
+# mutation). Idempotent per document.
+_DOM_WATCH_JS = """
+() => {
+    if (window.__domState) return;
+    const state = window.__domState = { dirty: true, version: 0, snapshot: null };
+    const touch = () => {
+        state.dirty = true;
+        state.version++;
+    };
+    const observe = () => {
+        new MutationObserver(touch).observe(
+            document.documentElement,
+            { childList: true, subtree: true, characterData: true, attributes: true,
+              attributeFilter: ['class', 'style', 'hidden', 'open', 'aria-hidden'] }
+        );
+        if (window.ResizeObserver) {
+            const resized = new ResizeObserver(touch);
+            resized.observe(document.documentElement);
+            if (document.body) resized.observe(document.body);
+            else document.addEventListener('DOMContentLoaded',
+                () => resized.observe(document.body), { once: true });
+        }
+    };
+    if (document.documentElement) observe();
+    else document.addEventListener('DOMContentLoaded', observe, { once: true });
+    // Typing changes input values without any DOM mutation
+    document.addEventListener('input', touch, true);
+}
+"""
+
+# Returns the cached snapshot while nothing has mutated (O(1) instead of a
+# full querySelectorAll('*') scan per poll); otherwise rescans and caches.
+# Installs the observer itself if the document predates the init script.
+_DOM_SNAPSHOT_JS = (
+    "() => {\n"
+    "    const cached = window.__domState;\n"
+    "    if (cached && !cached.dirty && cached.snapshot && cached.snapshot.url === location.href) {\n"
+    "        return cached.snapshot;\n"
+    "    }\n"
+    f"    ({_DOM_WATCH_JS})();\n"
+    f"    const snapshot = ({_STATE_INFO_JS})(false);\n"
+    "    window.__domState.snapshot = snapshot;\n"
+    "    window.__domState.dirty = false;\n"
+    "    return snapshot;\n"
+    "}"
+)
+
+
+
+@lru_cache(maxsize=None)
+def _page_cached(script: str) -> str:
+    """
+    Wrap a page function so it can skip the work on an unchanged page
+
+    The wrapper takes [known_key, arg]. It returns null when the page key
+    (document, URL, mutation version, scroll and viewport) still equals
+    known_key, else {key, result} with the function's result. The document
+    size is part of the key too: ResizeObserver callbacks only run after the
+    next layout, so a reflow the observer hasn't reported yet still misses.
+
+    Args:
+        script: JS function expression taking one argument (may be async)
+
+    Returns:
+        The wrapped JS function expression
+    """
+    return (
+        "async ([known, arg]) => {\n"
+        f"    ({_DOM_WATCH_JS})();\n"
+        "    const key = [performance.timeOrigin, location.href, window.__domState.version,\n"
+        "                 scrollX, scrollY, innerWidth, innerHeight,\n"
+        "                 document.documentElement.scrollWidth,\n"
+        "                 document.documentElement.scrollHeight].join('|');\n"
+        "    if (key === known) return null;\n"
+        f"    return {{key, result: await ({script})(arg)}};\n"
+        "}"
+    )
+
+
+# Pages that already have the mutation watcher init script
+_watched_pages: "weakref.WeakSet[Page]" = weakref.WeakSet()
+
+
+def _install_dom_watch(page: Page):
+    """Register the mutation watcher on a page (once per page)"""
+    if page not in _watched_pages:
+        page.add_init_script(f"({_DOM_WATCH_JS})()")
+        _watched_pages.add(page)
 
 
 class StateDetector:
@@ -10,27 +156,25 @@ class StateDetector:
     def __init__(self, page: Page):
         self.page = page
         self.last_snapshot: Optional[Dict] = None
+        # Every new document gets the mutation watcher before its own scripts.
+        # Detectors are rebuilt after each goto on long-lived pages, so the
+        # script is only registered the first time
+        _install_dom_watch(page)
+        # (method, args) -> (page key, result) of the last element extraction
+        self._elements_cache: Dict[Tuple[str, str], Tuple[str, Any]] = {}
         
     def get_dom_snapshot(self) -> Dict[str, Any]:
         """
         Get a snapshot of current DOM state
         
+        Same fields as get_current_state_info (including has_modal and
+        has_dropdown), but served from a page-side cache that a
+        MutationObserver invalidates - polling an unchanged page is O(1).
+
         Returns:
             Dictionary with DOM metrics
         """
-        snapshot = self.page.evaluate("""
-            () => {
-                return {
-                    element_count: document.querySelectorAll('*').length,
-                    modal_count: document.querySelectorAll('[role="dialog"], .modal, [class*="modal"]').length,
-                    form_count: document.querySelectorAll('form, [role="form"]').length,
-                    button_count: document.querySelectorAll('button, [role="button"]').length,
-                    url: window.location.href,
-                    title: document.title,
-                };
-            }
-        """)
-        return snapshot
+        return self.page.evaluate(_DOM_SNAPSHOT_JS)
     
     def detect_modal(self) -> bool:
         """
@@ -103,23 +247,23 @@ class StateDetector:
         # URL changed?
         if current_snapshot['url'] != self.last_snapshot['url']:
             changed = True
-            print("🔍 URL changed")
+            log.info("🔍 URL changed")
         
         # New modal appeared?
         if current_snapshot['modal_count'] > self.last_snapshot['modal_count']:
             changed = True
-            print("🔍 Modal appeared")
+            log.info("🔍 Modal appeared")
         
         # New form appeared?
         if current_snapshot['form_count'] > self.last_snapshot['form_count']:
             changed = True
-            print("🔍 Form appeared")
+            log.info("🔍 Form appeared")
         
         # Element count changed significantly?
         element_diff = abs(current_snapshot['element_count'] - self.last_snapshot['element_count'])
         if element_diff > 10:  # More than 10 new elements
             changed = True
-            print(f"🔍 DOM changed significantly ({element_diff} elements)")
+            log.info(f"🔍 DOM changed significantly ({element_diff} elements)")
         
         # Update last snapshot
         if changed:
@@ -127,26 +271,41 @@ class StateDetector:
         
         return changed
     
-    def get_current_state_info(self) -> Dict[str, Any]:
+    def _evaluate_cached(self, name: str, script: str, arg: Any) -> Any:
         """
-        Get information about the current UI state
+        Evaluate an element-extraction script, reusing the last result while
+        the page hasn't mutated, navigated or scrolled (still one round-trip,
+        but no DOM scan on a hit)
+
+        Args:
+            name: Cache slot (one per extraction method)
+            script: JS function expression taking arg
+            arg: JSON-serializable argument
+
+        Returns:
+            The script's result
+        """
+        slot = (name, repr(arg))
+        cached = self._elements_cache.get(slot)
+        reply = self.page.evaluate(_page_cached(script), [cached[0] if cached else None, arg])
+        if reply is None:
+            return cached[1]
+        self._elements_cache[slot] = (reply['key'], reply['result'])
+        return reply['result']
+
+    def get_current_state_info(self, summary: bool = False) -> Dict[str, Any]:
+        """
+        Get information about the current UI state (one page.evaluate)
         
+        Args:
+            summary: Also include interactive_elements, has_forms,
+                has_success_indicator and visible_text_summary
+
         Returns:
             Dictionary with state information
         """
-        snapshot = self.get_dom_snapshot()
-        
-        state_info = {
-            "url": snapshot['url'],
-            "title": snapshot['title'],
-            "has_modal": self.detect_modal(),
-            "has_dropdown": self.detect_dropdown(),
-            "element_count": snapshot['element_count'],
-            "modal_count": snapshot['modal_count'],
-            "form_count": snapshot['form_count'],
-            "timestamp": int(time.time()),
-        }
-        
+        state_info = self.page.evaluate(_STATE_INFO_JS, summary)
+        state_info["timestamp"] = int(time.time())
         return state_info
     
     def wait_for_state_change(self, timeout_ms: int = 5000) -> bool:
@@ -182,11 +341,8 @@ class StateDetector:
         Returns:
             List of interactive elements with text, role, and selector
         """
-        elements = self.page.evaluate("""
+        elements = self._evaluate_cached("interactive", """
             (limit) => {
-                const elements = [];
-                let count = 0;
-
                 // Helper to get a good selector for an element
                 function getSelector(el) {
                     // Try ID first
@@ -247,36 +403,42 @@ class StateDetector:
                     '[contenteditable]'  // Match ANY contenteditable value
                 ];
 
-                for (const selector of selectors) {
-                    if (count >= limit) break;
-
-                    const els = document.querySelectorAll(selector);
-                    for (const el of els) {
-                        if (count >= limit) break;
-                        if (!isVisible(el)) continue;
-
-                        const text = el.textContent?.trim() || el.value || el.placeholder || '';
-                        if (!text && el.tagName !== 'INPUT' && el.tagName !== 'TEXTAREA') continue;
-
-                        elements.push({
-                            selector: getSelector(el),
-                            text: text.substring(0, 100),
-                            role: el.getAttribute('role') || el.tagName.toLowerCase(),
-                            type: el.type || 'element',
-                            ariaLabel: el.ariaLabel || ''
-                        });
+                // One TreeWalker pass instead of a querySelectorAll traversal
+                // per selector. Matches are bucketed by selector so the
+                // result keeps the selector-priority order
+                const combined = selectors.join(', ');
+                const buckets = selectors.map(() => []);
+                const walker = document.createTreeWalker(document.body || document.documentElement, NodeFilter.SHOW_ELEMENT);
+                for (let el = walker.nextNode(); el; el = walker.nextNode()) {
+                    if (!el.matches(combined) || !isVisible(el)) continue;
+
+                    const text = el.textContent?.trim() || el.value || el.placeholder || '';
+                    if (!text && el.tagName !== 'INPUT' && el.tagName !== 'TEXTAREA') continue;
+
+                    buckets[selectors.findIndex(selector => el.matches(selector))].push({
+                        selector: getSelector(el),
+                        text: text.substring(0, 100),
+                        role: el.getAttribute('role') || el.tagName.toLowerCase(),
+                        type: el.type || 'element',
+                        ariaLabel: el.ariaLabel || ''
+                    });
 
-                        count++;
-                    }
+                    // Nothing later in the walk can outrank a full first bucket
+                    if (buckets[0].length >= limit) break;
                 }
 
-                return elements;
+                return [].concat(...buckets).slice(0, limit);
             }
         """, limit)
 
         return elements
 
-    def get_focused_interactive_elements(self, limit: int = 50) -> List[Dict[str, Any]]:
+    def get_focused_interactive_elements(
+        self,
+        limit: int = 50,
+        has_modal: Optional[bool] = None,
+        has_dropdown: Optional[bool] = None
+    ) -> List[Dict[str, Any]]:
         """
         Get interactive elements with smart prioritization based on UI state.
 
@@ -285,17 +447,15 @@ class StateDetector:
 
         Args:
             limit: Maximum number of elements to return
+            has_modal: Modal flag from get_current_state_info (detected in
+                the same evaluate if None)
+            has_dropdown: Dropdown flag, same as has_modal
 
         Returns:
             List of prioritized interactive elements
         """
-        has_modal = self.detect_modal()
-        has_dropdown = self.detect_dropdown()
-
-        elements = self.page.evaluate("""
+        elements = self._evaluate_cached("focused", """
             ({limit, has_modal, has_dropdown}) => {
-                const elements = [];
-
                 // Helper functions (same as before)
                 function getSelector(el) {
                     if (el.id) return `#${el.id}`;
@@ -323,8 +483,24 @@ class StateDetector:
                            style.opacity !== '0';
                 }
 
+                // Same checks as detect_modal/detect_dropdown, when not precomputed
+                function anyShown(selector) {
+                    return Array.from(document.querySelectorAll(selector)).some(el => {
+                        const style = window.getComputedStyle(el);
+                        return style.display !== 'none' && style.visibility !== 'hidden';
+                    });
+                }
+                if (has_modal === null) {
+                    has_modal = anyShown('[role="dialog"], .modal, [class*="modal"], [class*="dialog"]');
+                }
+                if (has_dropdown === null) {
+                    has_dropdown = anyShown(
+                        '[role="menu"], [role="listbox"], .dropdown-menu, [class*="dropdown"][class*="open"]'
+                    );
+                }
+
                 // Get container to focus on
-                let container = document.body;
+                let container = document.body || document.documentElement;
                 if (has_modal) {
                     // Focus on modal content
                     const modals = document.querySelectorAll(
@@ -365,27 +541,29 @@ class StateDetector:
                     'a'
                 ];
 
-                for (const selector of selectors) {
-                    if (elements.length >= limit) break;
-                    const els = container.querySelectorAll(selector);
-                    for (const el of els) {
-                        if (elements.length >= limit) break;
-                        if (!isVisible(el)) continue;
-
-                        const text = el.textContent?.trim() || el.value || el.placeholder || '';
-                        if (!text && el.tagName !== 'INPUT' && el.tagName !== 'TEXTAREA' && el.tagName !== 'SELECT') continue;
-
-                        elements.push({
-                            selector: getSelector(el),
-                            text: text.substring(0, 100),
-                            role: el.getAttribute('role') || el.tagName.toLowerCase(),
-                            type: el.type || 'element',
-                            ariaLabel: el.ariaLabel || ''
-                        });
-                    }
+                // Single TreeWalker pass, bucketed by selector priority (see
+                // get_interactive_elements)
+                const combined = selectors.join(', ');
+                const buckets = selectors.map(() => []);
+                const walker = document.createTreeWalker(container, NodeFilter.SHOW_ELEMENT);
+                for (let el = walker.nextNode(); el; el = walker.nextNode()) {
+                    if (!el.matches(combined) || !isVisible(el)) continue;
+
+                    const text = el.textContent?.trim() || el.value || el.placeholder || '';
+                    if (!text && el.tagName !== 'INPUT' && el.tagName !== 'TEXTAREA' && el.tagName !== 'SELECT') continue;
+
+                    buckets[selectors.findIndex(selector => el.matches(selector))].push({
+                        selector: getSelector(el),
+                        text: text.substring(0, 100),
+                        role: el.getAttribute('role') || el.tagName.toLowerCase(),
+                        type: el.type || 'element',
+                        ariaLabel: el.ariaLabel || ''
+                    });
+
+                    if (buckets[0].length >= limit) break;
                 }
 
-                return elements;
+                return [].concat(...buckets).slice(0, limit);
             }
         """, {"limit": limit, "has_modal": has_modal, "has_dropdown": has_dropdown})
 
@@ -404,18 +582,23 @@ class StateDetector:
         - position: {x, y, width, height} bounding box
         - selector: fallback CSS selector
         """
-        elements = self.page.evaluate("""
-            (limit) => {
-                const elements = [];
-
-                function isVisible(el) {
+        # The page returns columns (a flat int array of boxes plus one list
+        # per string field) instead of one keyed object per element, which
+        # keeps the CDP payload to the values themselves
+        columns = self._evaluate_cached("positions", """
+            async (limit) => {
+                const columns = {rects: [], texts: [], roles: [], types: [], selectors: [], ariaLabels: []};
+
+                function isVisible(el, rect) {
+                    if (rect.width === 0 || rect.height === 0) return false;
+                    // checkVisibility skips the computed-style object (Chromium 105+)
+                    if (el.checkVisibility) {
+                        return el.checkVisibility({opacityProperty: true, visibilityProperty: true});
+                    }
                     const style = window.getComputedStyle(el);
-                    const rect = el.getBoundingClientRect();
                     return style.display !== 'none' &&
                            style.visibility !== 'hidden' &&
-                           style.opacity !== '0' &&
-                           rect.width > 0 &&
-                           rect.height > 0;
+                           style.opacity !== '0';
                 }
 
                 function getTextContent(el) {
@@ -449,42 +632,69 @@ class StateDetector:
                     '[contenteditable]'  // Match ANY contenteditable (true, plaintext-only, etc.)
                 ];
 
-                const allElements = [];
-                for (const selector of selectors) {
-                    const els = document.querySelectorAll(selector);
-                    allElements.push(...Array.from(els));
-                }
+                // One querySelectorAll over the combined selector (one DOM
+                // walk instead of one per selector), then a stable sort back
+                // into selector order so mark numbering is unchanged
+                const rank = el => selectors.findIndex(selector => el.matches(selector));
+                const allElements = Array.from(document.querySelectorAll(selectors.join(', ')))
+                    .map(el => [rank(el), el])
+                    .sort((a, b) => a[0] - b[0])
+                    .map(([, el]) => el);
+
+                // Pass 1 above only queried the DOM; all layout reads happen
+                // here, one rect per candidate, so layout is computed once
+                // Nested wrappers (<a><button>Save</button></a>) are distinct
+                // elements with the same box - mark the box once so they
+                // don't spend two slots of the limit and two SoM labels
+                const seenBoxes = new Set();
+                for (let i = 0; i < allElements.length && columns.texts.length < limit; i++) {
+                    // Yield to the page's event loop every 500 candidates so
+                    // a long scan on a heavy app doesn't stall its own work
+                    if (i > 0 && i % 500 === 0) await new Promise(r => setTimeout(r, 0));
 
-                // Filter visible, get positions, limit
-                for (let i = 0; i < allElements.length && elements.length < limit; i++) {
                     const el = allElements[i];
-                    if (!isVisible(el)) continue;
-
                     const rect = el.getBoundingClientRect();
+                    if (!isVisible(el, rect)) continue;
+
                     const text = getTextContent(el);
 
                     // Skip elements with no text (unless input/textarea/contenteditable)
                     if (!text && el.tagName !== 'INPUT' && el.tagName !== 'TEXTAREA' && !el.hasAttribute('contenteditable')) continue;
 
-                    elements.push({
-                        text: text,
-                        role: el.getAttribute('role') || el.tagName.toLowerCase(),
-                        type: el.type || '',
-                        position: {
-                            x: Math.round(rect.left),
-                            y: Math.round(rect.top),
-                            width: Math.round(rect.width),
-                            height: Math.round(rect.height),
-                            centerX: Math.round(rect.left + rect.width / 2),
-                            centerY: Math.round(rect.top + rect.height / 2)
-                        },
-                        selector: getSimpleSelector(el, i),
-                        ariaLabel: el.ariaLabel || ''
-                    });
+                    const box = [rect.left, rect.top, rect.width, rect.height].map(Math.round);
+                    const boxKey = box.join(',');
+                    if (seenBoxes.has(boxKey)) continue;
+                    seenBoxes.add(boxKey);
+
+                    columns.rects.push(...box);
+                    columns.texts.push(text);
+                    columns.roles.push(el.getAttribute('role') || el.tagName.toLowerCase());
+                    columns.types.push(el.type || '');
+                    columns.selectors.push(getSimpleSelector(el, i));
+                    columns.ariaLabels.push(el.ariaLabel || '');
                 }
 
-                return elements;
+                return columns;
             }
         """, limit)
 
+        rects = columns['rects']
+        elements = []
+        for index, text in enumerate(columns['texts']):
+            x, y, width, height = rects[4 * index:4 * index + 4]
+            elements.append({
+                'text': text,
+                'role': columns['roles'][index],
+                'type': columns['types'][index],
+                'position': {
+                    'x': x,
+                    'y': y,
+                    'width': width,
+                    'height': height,
+                    'centerX': x + width // 2,
+                    'centerY': y + height // 2
+                },
+                'selector': columns['selectors'][index],
+                'ariaLabel': columns['ariaLabels'][index]
+            })
         return elements
\ No newline at end of file
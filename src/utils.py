@@ -1,9 +1,18 @@
 """Utility functions for state detection and comparison"""
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
 from pathlib import Path
 import json
 
+from .log import get_logger
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+log = get_logger(__name__)
+
 
 def generate_state_id(description: str) -> str:
     """Generate a unique ID for a state"""
@@ -12,6 +21,26 @@ def generate_state_id(description: str) -> str:
     return f"{clean_desc}_{timestamp}"
 
 
+def loads_json(data: Union[str, bytes]) -> Any:
+    """Parse JSON with orjson when available, falling back to the stdlib"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(data: Any) -> bytes:
+    """
+    Serialize to indented UTF-8 JSON with orjson when available
+
+    Int dict keys (e.g. SoM element ids) become strings, as with json.dumps.
+    Non-ASCII text is written as raw UTF-8, not \\u escapes - orjson has no
+    ensure_ascii, so the stdlib fallback matches it with ensure_ascii=False.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode()
+
+
 def save_metadata(
     screenshot_path: Path,
     state_info: Dict[str, Any],
@@ -43,7 +72,7 @@ def save_metadata(
     with open(metadata_path, 'w') as f:
         json.dump(metadata, f, indent=2)
     
-    print(f"💾 Metadata saved: {metadata_path.name}")
+    log.info(f"💾 Metadata saved: {metadata_path.name}")
     return metadata_path
 
 
@@ -77,4 +106,4 @@ def wait_for_stability(page, timeout_ms: int = 2000):
         # Additional small wait for animations
         page.wait_for_timeout(500)
     except Exception as e:
-        print(f"⚠️  Page may not be fully stable: {e}")
\ No newline at end of file
+        log.warning(f"⚠️  Page may not be fully stable: {e}")
\ No newline at end of file
@@ -1,20 +1,112 @@
 """Workflow execution engine - both basic and enhanced versions"""
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Callable, Dict, Any, List, Optional, Tuple, Iterator
+from contextlib import contextmanager
+from io import BytesIO
 from pathlib import Path
+import asyncio
 import time
 import json
+import queue
+import threading
 
-from .browser import PersistentBrowserAgent as BrowserAgent
+from PIL import Image
+
+from .browser import PersistentBrowserAgent as BrowserAgent, get_session_dir, stop_thread_playwright
+from .browser_pool import BrowserPool, get_thread_pool
+from .shared_browser import get_shared_cdp_url
 from .llm_agent import LLMAgent
 from .state_detector import StateDetector
 from .som_annotator import SoMAnnotator
+from .skill_cache import SkillCache, skill_step
 from .utils import save_metadata
-from .config import SCREENSHOTS_DIR, APP_URLS
+from .config import SCREENSHOTS_DIR, APP_URLS, CDP_ENDPOINT, SHARED_CDP
+from .log import get_logger
 
 try:
-    from .auth_manager import AuthManager
+    from .auth_manager import get_auth_manager
 except ImportError:
-    AuthManager = None
+    get_auth_manager = None
+
+log = get_logger(__name__)
+
+
+def _execute_parallel(
+    spawn_worker,
+    queries: List[str],
+    parallel: int,
+    headless: bool
+) -> List[Dict[str, Any]]:
+    """
+    Run workflows concurrently, one engine per worker thread
+
+    Playwright's sync API is bound to the thread that started it, so every
+    worker gets its own engine (LLM history) and BrowserPool, and pulls
+    queries from a shared queue until it is drained. Pooled contexts load the
+    saved session state instead of locking a shared profile directory.
+
+    Args:
+        spawn_worker: Callable taking a BrowserPool and returning a fresh engine
+        queries: List of natural language queries
+        parallel: Maximum number of concurrent workflows
+        headless: Run worker browsers in headless mode
+
+    Returns:
+        List of workflow results, in query order
+    """
+    pending: "queue.Queue[Tuple[int, str]]" = queue.Queue()
+    for index, query in enumerate(queries):
+        pending.put((index, query))
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(queries)
+    worker_count = min(parallel, len(queries))
+    log.info(f"\n⚡ Running {len(queries)} workflows with {worker_count} parallel workers")
+
+    # Workers attach to one shared browser instead of launching their own
+    cdp_endpoint = CDP_ENDPOINT
+    if cdp_endpoint is None and SHARED_CDP:
+        cdp_endpoint = get_shared_cdp_url(headless)
+
+    def worker():
+        try:
+            with BrowserPool(size=1, headless=headless, cdp_endpoint=cdp_endpoint) as pool:
+                _drain(pool)
+        finally:
+            stop_thread_playwright()
+
+    def _drain(pool: BrowserPool):
+        engine = None
+        while True:
+            try:
+                index, query = pending.get_nowait()
+            except queue.Empty:
+                return
+
+            log.info(f"\n{'='*80}")
+            log.info(f"BATCH EXECUTION: {index + 1}/{len(queries)} ({threading.current_thread().name})")
+            log.info(f"{'='*80}")
+
+            try:
+                if engine is None:
+                    engine = spawn_worker(pool)
+                results[index] = engine.execute_workflow(query)
+            except Exception as e:
+                log.error(f"❌ Workflow failed: {e}")
+                results[index] = {
+                    'status': 'failed',
+                    'error': str(e),
+                    'query': query,
+                }
+
+    threads = [
+        threading.Thread(target=worker, name=f"workflow-{n + 1}")
+        for n in range(worker_count)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return results
 
 
 class EnhancedWorkflowEngine:
@@ -28,7 +120,9 @@ class EnhancedWorkflowEngine:
         max_steps: int = 10,
         use_auth: bool = True,
         use_session: bool = False,
-        credentials_path: Optional[Path] = None
+        credentials_path: Optional[Path] = None,
+        pool: Optional[BrowserPool] = None,
+        use_skills: bool = False
     ):
         """
         Initialize enhanced workflow engine
@@ -39,14 +133,23 @@ class EnhancedWorkflowEngine:
             use_auth: Whether to attempt authentication
             use_session: Whether to use saved browser sessions (for OAuth)
             credentials_path: Optional path to credentials JSON
+            pool: Optional BrowserPool to check warm browsers out of
+            use_skills: Replay recorded steps of previously successful runs
+                (skips the per-step screenshots, so off for dataset capture)
         """
         self.headless = headless
         self.max_steps = max_steps
         self.use_auth = use_auth
         self.use_session = use_session
+        self.credentials_path = credentials_path
+        self.pool = pool
         self.llm_agent = LLMAgent()
-        self.auth_manager = AuthManager(credentials_path) if use_auth else None
+        self.auth_manager = get_auth_manager(credentials_path) if use_auth else None
         self.key_states = []  # Track important states
+        self.use_skills = use_skills
+        self.skill_cache = SkillCache()  # Successful runs are always recorded
+        self._skill_steps: List[Dict[str, Any]] = []  # Replayable steps of the current run
+        self._replay_fell_back = False  # Current run started with a failed replay
         
     def execute_workflow(self, query: str) -> Dict[str, Any]:
         """
@@ -58,25 +161,25 @@ class EnhancedWorkflowEngine:
         Returns:
             Dictionary with workflow results
         """
-        print("\n" + "="*80)
-        print(f"🚀 EXECUTING ENHANCED WORKFLOW")
-        print(f"📝 Query: {query}")
-        print("="*80 + "\n")
+        log.info("\n" + "="*80)
+        log.info(f"🚀 EXECUTING ENHANCED WORKFLOW")
+        log.info(f"📝 Query: {query}")
+        log.info("="*80 + "\n")
         
         # Parse the query
         parsed = self.llm_agent.parse_query(query)
         app = parsed['app']
         task = parsed['task']
         
-        print(f"📋 Task: {task}")
-        print(f"🎯 App: {app}")
+        log.info(f"📋 Task: {task}")
+        log.info(f"🎯 App: {app}")
         
         # Get app URL
         app_url = self._get_app_url(app)
         
         # Create task directory
         task_dir = self._create_task_directory(app, task)
-        print(f"📁 Saving to: {task_dir}")
+        log.info(f"📁 Saving to: {task_dir}")
         
         # Save workflow metadata
         self._save_workflow_metadata(task_dir, query, parsed)
@@ -89,19 +192,29 @@ class EnhancedWorkflowEngine:
             task_dir=task_dir
         )
         
+        # Record the run for replay next time. Replays are already recorded,
+        # and a run that fell back from a failed replay only recorded the
+        # steps after the replay's, which don't start from the app's start page
+        if (
+            workflow_result['status'] == 'completed'
+            and not workflow_result.get('replayed')
+            and not self._replay_fell_back
+        ):
+            self.skill_cache.save(app, task, self._skill_steps)
+
         # Generate summary
         summary = self.generate_workflow_summary(workflow_result)
         
         # Save summary
         self._save_workflow_summary(task_dir, summary)
         
-        print("\n" + "="*80)
-        print(f"✅ ENHANCED WORKFLOW COMPLETE")
-        print(f"   Status: {workflow_result['status']}")
-        print(f"   Steps: {workflow_result['step_count']}")
-        print(f"   Screenshots: {workflow_result['screenshot_count']}")
-        print(f"   Key States: {len(workflow_result.get('key_states', []))}")
-        print("="*80 + "\n")
+        log.info("\n" + "="*80)
+        log.info(f"✅ ENHANCED WORKFLOW COMPLETE")
+        log.info(f"   Status: {workflow_result['status']}")
+        log.info(f"   Steps: {workflow_result['step_count']}")
+        log.info(f"   Screenshots: {workflow_result['screenshot_count']}")
+        log.info(f"   Key States: {len(workflow_result.get('key_states', []))}")
+        log.info("="*80 + "\n")
         
         return workflow_result
     
@@ -123,43 +236,56 @@ class EnhancedWorkflowEngine:
         max_failures = 3
         repeated_action_count = 0  # Track same action attempts
         last_action_signature = None  # Track what action was attempted
+        self._skill_steps = []
+        self._replay_fell_back = False
 
-        # Choose browser type based on session preference
+        # Choose browser session based on session preference
         # BrowserAgent is actually PersistentBrowserAgent - it always uses sessions
         if self.use_session:
-            print(f"🔄 Using persistent session for {app}")
-            browser = BrowserAgent(
-                headless=self.headless,
-                session_name=app
-            )
+            log.info(f"🔄 Using persistent session for {app}")
+            session_name = app
         else:
             # Use default session for non-session workflows
-            browser = BrowserAgent(
-                headless=self.headless,
-                session_name="default"
-            )
+            session_name = "default"
 
-        with browser:
+        with self._open_browser(session_name) as browser:
             # Step 0: Navigate to app
-            print(f"\n📍 Step 0: Navigating to {app_url}")
+            log.info(f"\n📍 Step 0: Navigating to {app_url}")
             browser.goto(app_url)
-            browser.wait(3000)
+
+            # goto() already waited for the network to settle - for known apps
+            # also wait for the main interface instead of a fixed delay. A
+            # login page never shows that interface, so skip the wait there
+            # rather than burning its full timeout
+            if self.auth_manager and not self.auth_manager.requires_auth(browser, app):
+                try:
+                    self.auth_manager.wait_for_app_load(browser, app)
+                except Exception:
+                    log.warning(f"⚠️  {app} interface not detected, continuing with current page")
 
             # Handle authentication - GENERALIZED (no app-specific logic)
             if self.use_session:
                 # Using persistent session - trust that login was done via setup_login.py
-                print("✅ Using persistent session - assuming authenticated")
-                print(f"   (If login fails, run: python setup_login.py {app})")
+                log.info("✅ Using persistent session - assuming authenticated")
+                log.info(f"   (If login fails, run: python setup_login.py {app})")
             elif self.use_auth:
                 # Not using session - remind user about session setup
-                print("\n⚠️  Running without --use-session flag")
-                print("   For OAuth/SSO apps, use --use-session after running setup_login.py")
-                print("   Continuing with current page state...")
+                log.warning("\n⚠️  Running without --use-session flag")
+                log.info("   For OAuth/SSO apps, use --use-session after running setup_login.py")
+                log.info("   Continuing with current page state...")
 
             # Dismiss any promotional modals that might block interaction
-            print("🧹 Checking for promotional modals...")
+            log.info("🧹 Checking for promotional modals...")
             browser.dismiss_promotional_modals()
 
+            # Known task: replay the recorded steps and skip the LLM loop
+            skill = self.skill_cache.load(app, task) if self.use_skills else None
+            if skill:
+                replayed = self._replay_skill(browser, app, app_url, task, skill, task_dir)
+                if replayed:
+                    return replayed
+                self._replay_fell_back = True
+
             # Get state detector
             detector = browser.get_state_detector()
             
@@ -167,13 +293,13 @@ class EnhancedWorkflowEngine:
             while step_count < self.max_steps:
                 step_count += 1
                 
-                print(f"\n{'─'*80}")
-                print(f"🔄 Step {step_count}/{self.max_steps}")
-                print(f"{'─'*80}")
+                log.info(f"\n{'─'*80}")
+                log.info(f"🔄 Step {step_count}/{self.max_steps}")
+                log.info(f"{'─'*80}")
 
                 # 0. Check for and dismiss promotional modals
                 if detector.detect_modal():
-                    print("🧹 Modal detected, attempting to dismiss...")
+                    log.info("🧹 Modal detected, attempting to dismiss...")
                     browser.dismiss_promotional_modals()
                     browser.wait(1000)
 
@@ -181,16 +307,16 @@ class EnhancedWorkflowEngine:
                 state_info = self._capture_enhanced_state(browser, detector, app)
                 state_info['step'] = step_count
                 
-                print(f"👁️  State Analysis:")
-                print(f"   URL: {state_info['url'][:60]}...")
-                print(f"   Title: {state_info['title'][:60]}...")
-                print(f"   Elements: {state_info['element_count']}")
-                print(f"   Interactive: {state_info.get('interactive_elements', 'N/A')}")
+                log.info(f"👁️  State Analysis:")
+                log.info(f"   URL: {state_info['url'][:60]}...")
+                log.info(f"   Title: {state_info['title'][:60]}...")
+                log.info(f"   Elements: {state_info['element_count']}")
+                log.info(f"   Interactive: {state_info.get('interactive_elements', 'N/A')}")
 
                 # 2. SET-OF-MARKS (SoM): Extract elements FIRST (before screenshot)
-                print(f"   🎯 Extracting interactive elements...")
+                log.info(f"   🎯 Extracting interactive elements...")
                 elements = detector.get_elements_with_positions(limit=100)
-                print(f"   Found {len(elements)} interactive elements")
+                log.info(f"   Found {len(elements)} interactive elements")
 
                 # 3. CAPTURE: Take screenshot (after elements extracted, same DOM state)
                 screenshot_name = f"{step_count:02d}_{self._generate_state_name(state_info)}"
@@ -205,7 +331,7 @@ class EnhancedWorkflowEngine:
 
                 # 4. CHECK FOR KEY STATE
                 if self._is_key_state(state_info, task):
-                    print("🌟 Key state detected!")
+                    log.info("🌟 Key state detected!")
                     key_states.append({
                         'step': step_count,
                         'screenshot': screenshot_path,
@@ -213,18 +339,22 @@ class EnhancedWorkflowEngine:
                     })
 
                 # 5. ANNOTATE: Add numbered marks to screenshot
-                print(f"   📍 Annotating screenshot with marks...")
+                log.info(f"   📍 Annotating screenshot with marks...")
 
-                # Annotate screenshot with numbered marks
+                # Annotate the captured bytes in memory - the saved file is
+                # only an artifact, the LLM gets the image object directly
                 annotator = SoMAnnotator()
-                annotated_screenshot, element_mapping = annotator.annotate_screenshot(
-                    screenshot_path,
-                    elements
+                annotated_screenshot = Image.open(BytesIO(browser.last_screenshot))
+                element_mapping = annotator.annotate_image(annotated_screenshot, elements)
+                annotator.save_annotation(
+                    annotated_screenshot,
+                    element_mapping,
+                    screenshot_path.parent / f"{screenshot_path.stem}_annotated.png"
                 )
-                print(f"   ✓ Screenshot annotated with {len(element_mapping)} marks")
+                log.info(f"   ✓ Screenshot annotated with {len(element_mapping)} marks")
 
                 # 5. DECIDE: Ask LLM what to do next (with annotated screenshot)
-                print(f"🤔 Deciding next action...")
+                log.info(f"🤔 Deciding next action...")
                 action = self.llm_agent.decide_action(
                     task=task,
                     screenshot_path=annotated_screenshot,  # Use annotated screenshot!
@@ -234,11 +364,12 @@ class EnhancedWorkflowEngine:
                     element_mapping=element_mapping  # Pass mapping for context
                 )
                 
-                print(f"💡 Decision: {action['action']}")
+                log.info(f"💡 Decision: {action['action']}")
                 if 'reasoning' in action:
-                    print(f"   Reasoning: {action['reasoning'][:100]}...")
+                    log.info(f"   Reasoning: {action['reasoning'][:100]}...")
                 
-                actions_taken.append(action)
+                # A batch counts as its individual steps for verification
+                actions_taken.extend(action['actions'] if action['action'] == 'batch' else [action])
                 
                 # 5. CHECK COMPLETION
                 if action['action'] == 'done' or self._detect_task_completion(task, state_info, actions_taken):
@@ -253,7 +384,7 @@ class EnhancedWorkflowEngine:
                             verified = any(item.lower() in page_text for item in created_items if item)
 
                             if not verified:
-                                print(f"⚠️  Verification failed: Created items {created_items} not found in page")
+                                log.warning(f"⚠️  Verification failed: Created items {created_items} not found in page")
 
                                 # AUTO-RECOVERY: Check if last action was 'fill' and we haven't tried Enter yet
                                 last_fill_action = next((a for a in reversed(actions_taken) if a.get('action') == 'fill'), None)
@@ -261,7 +392,7 @@ class EnhancedWorkflowEngine:
                                                        for a in actions_taken)
 
                                 if last_fill_action and not has_pressed_enter:
-                                    print(f"   💡 Auto-recovery: Pressing Enter to submit filled text")
+                                    log.info(f"   💡 Auto-recovery: Pressing Enter to submit filled text")
                                     # Inject Enter press action
                                     enter_action = {
                                         'action': 'press_key',
@@ -271,18 +402,18 @@ class EnhancedWorkflowEngine:
                                     }
                                     success = browser.execute_action(enter_action)
                                     actions_taken.append(enter_action)
-
                                     if success:
-                                        print(f"   ✓ Enter key pressed - continuing to verify")
+                                        self._skill_steps.append(skill_step(enter_action))
+                                        log.info(f"   ✓ Enter key pressed - continuing to verify")
                                         # Continue to next iteration to verify again
                                     else:
-                                        print(f"   ✗ Enter key failed - continuing workflow")
+                                        log.warning(f"   ✗ Enter key failed - continuing workflow")
                                 else:
-                                    print(f"   Continuing workflow - LLM may need to try a different approach")
+                                    log.info(f"   Continuing workflow - LLM may need to try a different approach")
                                 # Don't mark as done - continue to next step
                             else:
-                                print(f"✅ Verification passed: Found {created_items} in page")
-                                print("✅ Task completed successfully!")
+                                log.info(f"✅ Verification passed: Found {created_items} in page")
+                                log.info("✅ Task completed successfully!")
                                 return {
                                     'status': 'completed',
                                     'step_count': step_count,
@@ -294,7 +425,7 @@ class EnhancedWorkflowEngine:
                                 }
                         else:
                             # No fill actions found, just trust the LLM
-                            print("✅ Task completed successfully!")
+                            log.info("✅ Task completed successfully!")
                             return {
                                 'status': 'completed',
                                 'step_count': step_count,
@@ -306,7 +437,7 @@ class EnhancedWorkflowEngine:
                             }
                     else:
                         # Non-CREATE tasks - trust the LLM
-                        print("✅ Task completed successfully!")
+                        log.info("✅ Task completed successfully!")
                         return {
                             'status': 'completed',
                             'step_count': step_count,
@@ -318,22 +449,32 @@ class EnhancedWorkflowEngine:
                         }
                 
                 # 6. ACT: Execute the action
-                print(f"⚡ Executing: {action.get('description', action['action'])}")
+                log.info(f"⚡ Executing: {action.get('description', action['action'])}")
 
                 # Create signature for this action to detect repetition
-                action_signature = f"{action['action']}_{action.get('element_id', action.get('target_text', ''))}"
+                if action['action'] == 'batch':
+                    action_signature = "batch_" + "_".join(
+                        f"{a['action']}{a.get('element_id', '')}" for a in action['actions']
+                    )
+                else:
+                    action_signature = f"{action['action']}_{action.get('element_id', action.get('target_text', ''))}"
 
                 success = browser.execute_action(action, element_mapping=element_mapping)
+                if success:
+                    for executed in (action['actions'] if action['action'] == 'batch' else [action]):
+                        step = skill_step(executed, element_mapping)
+                        if step:
+                            self._skill_steps.append(step)
 
                 # Wait for page to stabilize after action (animations, DOM updates)
                 browser.wait(1500)
 
                 if not success:
                     consecutive_failures += 1
-                    print(f"⚠️  Action failed ({consecutive_failures}/{max_failures})")
+                    log.warning(f"⚠️  Action failed ({consecutive_failures}/{max_failures})")
 
                     if consecutive_failures >= max_failures:
-                        print("❌ Too many consecutive failures")
+                        log.error("❌ Too many consecutive failures")
                         return {
                             'status': 'failed',
                             'step_count': step_count,
@@ -351,8 +492,8 @@ class EnhancedWorkflowEngine:
                 if action_signature == last_action_signature:
                     repeated_action_count += 1
                     if repeated_action_count >= 3:
-                        print(f"⚠️  Stuck: Same action repeated {repeated_action_count} times without progress")
-                        print(f"   Suggesting LLM try alternative approach...")
+                        log.warning(f"⚠️  Stuck: Same action repeated {repeated_action_count} times without progress")
+                        log.info(f"   Suggesting LLM try alternative approach...")
                         # Add a hint in the state for the LLM to see
                         state_info['stuck_warning'] = f"Previous action (element {action.get('element_id')}) repeated {repeated_action_count}x with no progress. Try different element or approach."
                 else:
@@ -364,11 +505,13 @@ class EnhancedWorkflowEngine:
                 
                 # Check for significant state change
                 if detector.has_significant_change():
-                    print("🔍 Significant state change detected")
+                    log.info("🔍 Significant state change detected")
                     
                     # Capture transition state if modal/dropdown appeared
-                    if detector.detect_modal() or detector.detect_dropdown():
-                        print("📸 Capturing transition state...")
+                    # last_snapshot is the state that was just compared
+                    snapshot = detector.last_snapshot
+                    if snapshot['has_modal'] or snapshot['has_dropdown']:
+                        log.info("📸 Capturing transition state...")
                         transition_screenshot = browser.take_screenshot(
                             f"{step_count:02d}b_transition",
                             task_dir=task_dir
@@ -376,7 +519,7 @@ class EnhancedWorkflowEngine:
                         screenshots.append(transition_screenshot)
             
             # Hit max steps
-            print(f"\n⚠️  Reached maximum steps ({self.max_steps})")
+            log.warning(f"\n⚠️  Reached maximum steps ({self.max_steps})")
             return {
                 'status': 'max_steps_reached',
                 'step_count': step_count,
@@ -387,6 +530,105 @@ class EnhancedWorkflowEngine:
                 'task_dir': task_dir,
             }
     
+    def _replay_skill(
+        self,
+        browser: BrowserAgent,
+        app: str,
+        app_url: str,
+        task: str,
+        steps: List[Dict[str, Any]],
+        task_dir: Path
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Replay a recorded skill without screenshots or LLM calls
+
+        Args:
+            browser: Browser already on the app's start page
+            app: App name
+            app_url: Start page, reloaded whenever the replay fails
+            task: Task description
+            steps: Steps from the skill cache
+            task_dir: Directory for the final screenshot
+
+        Returns:
+            A completed workflow result, or None if it failed (the caller
+            falls back to the LLM loop)
+        """
+        log.info(f"⏩ Replaying recorded skill ({len(steps)} steps)")
+        actions = []
+        for index, step in enumerate(steps, start=1):
+            action = {key: value for key, value in step.items() if key != 'element'}
+            mapping = None
+            if 'element' in step:
+                action['element_id'] = 1
+                mapping = {1: step['element']}
+
+            # No screenshot between steps, so the target may still be
+            # rendering after the previous one - retry once after a pause
+            succeeded = browser.execute_action(action, element_mapping=mapping)
+            if not succeeded:
+                browser.wait(1000)
+                succeeded = browser.execute_action(action, element_mapping=mapping)
+            if not succeeded:
+                log.warning(f"⚠️  Replay failed at step {index}/{len(steps)} - falling back to LLM")
+                self.skill_cache.invalidate(app, task)
+                # Earlier steps may have changed the page - start over
+                browser.goto(app_url)
+                return None
+            actions.append(action)
+
+        # Same check the LLM loop applies before trusting a CREATE task
+        created_items = [a['text'] for a in actions if a.get('action') == 'fill' and a.get('text')]
+        if 'create' in task.lower() and created_items:
+            page_text = browser.page.text_content('body').lower()
+            if not any(item.lower() in page_text for item in created_items):
+                log.warning(f"⚠️  Replay finished but {created_items} not found - falling back to LLM")
+                self.skill_cache.invalidate(app, task)
+                # The page is at the end of the replayed flow - start over
+                browser.goto(app_url)
+                return None
+
+        screenshot_path = browser.take_screenshot("replay_final", task_dir=task_dir)
+        log.info("✅ Task completed by replay!")
+        return {
+            'status': 'completed',
+            'replayed': True,
+            'step_count': len(actions),
+            'screenshot_count': 1,
+            'screenshots': [screenshot_path],
+            'actions': actions,
+            'key_states': [],
+            'task_dir': task_dir,
+        }
+
+    @contextmanager
+    def _open_browser(self, session_name: str) -> Iterator[BrowserAgent]:
+        """
+        Start a browser for one workflow
+
+        The context is preloaded from the session's saved storage state
+        (cookies + localStorage, written by setup_login.py) rather than
+        opening the full Chromium profile, so concurrent workflows can share
+        one saved login. Uses the engine's pool when one was provided,
+        otherwise the thread's shared pool, so the browser stays warm for
+        the next workflow.
+        """
+        pool = self.pool or get_thread_pool(self.headless)
+        with self._open_pooled_browser(pool, session_name) as browser:
+            yield browser
+
+    @contextmanager
+    def _open_pooled_browser(self, pool: BrowserPool, session_name: str) -> Iterator[BrowserAgent]:
+        """Open a browser on a pooled context loaded with the session's state"""
+        state_path = get_session_dir(session_name) / "state.json"
+        with pool.acquire(storage_state=state_path) as context:
+            with BrowserAgent(
+                headless=self.headless,
+                session_name=session_name,
+                context=context
+            ) as browser:
+                yield browser
+
     def _capture_enhanced_state(
         self,
         browser: BrowserAgent,
@@ -394,92 +636,13 @@ class EnhancedWorkflowEngine:
         app: str
     ) -> Dict[str, Any]:
         """Capture enhanced state information"""
-        base_state = detector.get_current_state_info()
-        
-        # Add enhanced information
-        enhanced_state = {
-            **base_state,
-            'app': app,
-            'interactive_elements': self._count_interactive_elements(browser),
-            'has_forms': self._detect_forms(browser),
-            'has_success_indicator': self._detect_success_indicators(browser),
-            'visible_text_summary': self._get_visible_text_summary(browser),
-        }
+        # Base state plus the page summary (interactive count, forms,
+        # success indicator, visible text) in a single round-trip
+        enhanced_state = detector.get_current_state_info(summary=True)
+        enhanced_state['app'] = app
         
         return enhanced_state
     
-    def _count_interactive_elements(self, browser: BrowserAgent) -> int:
-        """Count interactive elements on the page"""
-        try:
-            return browser.page.evaluate("""
-                () => {
-                    const interactive = document.querySelectorAll(
-                        'button, a, input, textarea, select, [role="button"], [onclick]'
-                    );
-                    return interactive.length;
-                }
-            """)
-        except:
-            return 0
-    
-    def _detect_forms(self, browser: BrowserAgent) -> bool:
-        """Detect if there are forms on the page"""
-        try:
-            return browser.page.evaluate("""
-                () => {
-                    const forms = document.querySelectorAll('form, [role="form"]');
-                    const inputs = document.querySelectorAll('input, textarea, select');
-                    return forms.length > 0 || inputs.length > 2;
-                }
-            """)
-        except:
-            return False
-    
-    def _detect_success_indicators(self, browser: BrowserAgent) -> bool:
-        """Detect success indicators (toasts, alerts, success messages)"""
-        try:
-            return browser.page.evaluate("""
-                () => {
-                    // Look for success indicators
-                    const selectors = [
-                        '[class*="success"]', '[class*="toast"]', '[class*="alert"]',
-                        '[role="alert"]', '[class*="notification"]',
-                        ':contains("successfully")', ':contains("created")',
-                        ':contains("saved")', ':contains("completed")'
-                    ];
-                    
-                    for (let selector of selectors) {
-                        try {
-                            if (document.querySelector(selector)) return true;
-                        } catch (e) {}
-                    }
-                    
-                    // Check for success in text
-                    const bodyText = document.body.innerText.toLowerCase();
-                    const successWords = ['success', 'created', 'saved', 'completed', 'done'];
-                    return successWords.some(word => bodyText.includes(word));
-                }
-            """)
-        except:
-            return False
-    
-    def _get_visible_text_summary(self, browser: BrowserAgent) -> str:
-        """Get a summary of visible text on the page"""
-        try:
-            text = browser.page.evaluate("""
-                () => {
-                    const elements = document.querySelectorAll('h1, h2, h3, button, [role="button"]');
-                    const texts = Array.from(elements)
-                        .map(el => el.innerText?.trim())
-                        .filter(text => text && text.length > 0)
-                        .slice(0, 10);
-                    return texts.join(' | ');
-                }
-            """)
-            return text[:200] if text else ""
-        except:
-            return ""
-    
     def _is_key_state(self, state_info: Dict[str, Any], task: str) -> bool:
         """Determine if current state is a key state for the task"""
         # Key states are typically:
@@ -650,20 +813,32 @@ class EnhancedWorkflowEngine:
         
         return summary
     
-    def execute_batch(self, queries: List[str]) -> List[Dict[str, Any]]:
-        """Execute multiple workflows in batch"""
+    def execute_batch(self, queries: List[str], parallel: int = 1) -> List[Dict[str, Any]]:
+        """
+        Execute multiple workflows in batch
+
+        Args:
+            queries: List of natural language queries
+            parallel: Number of workflows to run concurrently
+
+        Returns:
+            List of workflow results, in query order
+        """
+        if parallel > 1 and len(queries) > 1:
+            return _execute_parallel(self._spawn_worker, queries, parallel, self.headless)
+
         results = []
         
         for i, query in enumerate(queries, 1):
-            print(f"\n{'='*80}")
-            print(f"BATCH EXECUTION: {i}/{len(queries)}")
-            print(f"{'='*80}")
+            log.info(f"\n{'='*80}")
+            log.info(f"BATCH EXECUTION: {i}/{len(queries)}")
+            log.info(f"{'='*80}")
             
             try:
                 result = self.execute_workflow(query)
                 results.append(result)
             except Exception as e:
-                print(f"❌ Workflow failed: {e}")
+                log.error(f"❌ Workflow failed: {e}")
                 results.append({
                     'status': 'failed',
                     'error': str(e),
@@ -672,11 +847,54 @@ class EnhancedWorkflowEngine:
             
             # Pause between workflows
             if i < len(queries):
-                print(f"\n⏸️  Pausing 5 seconds before next workflow...")
+                log.info(f"\n⏸️  Pausing 5 seconds before next workflow...")
                 time.sleep(5)
 
         return results
 
+    async def execute_batch_async(self, queries: List[str], parallel: int = 1) -> List[Dict[str, Any]]:
+        """
+        Awaitable execute_batch for asyncio callers
+
+        Playwright's sync objects are bound to their threads, so rather than
+        a second async engine this runs the same thread-per-worker batch off
+        the event loop; the loop stays free while workflows overlap. Every
+        worker (even with parallel=1) gets its own engine and pool, since
+        this engine's pool belongs to the calling thread. The executor
+        thread owns the shared CDP browser (if any) and stops it when the
+        batch ends.
+
+        Args:
+            queries: List of natural language queries
+            parallel: Number of workflows to run concurrently
+
+        Returns:
+            List of workflow results, in query order
+        """
+        if not queries:
+            return []
+
+        def run_batch() -> List[Dict[str, Any]]:
+            try:
+                return _execute_parallel(self._spawn_worker, queries, max(parallel, 1), self.headless)
+            finally:
+                # Executor threads are never stopped by the atexit hook
+                stop_thread_playwright()
+
+        return await asyncio.to_thread(run_batch)
+
+    def _spawn_worker(self, pool: BrowserPool) -> 'EnhancedWorkflowEngine':
+        """Create an engine with the same settings for a parallel batch worker"""
+        return EnhancedWorkflowEngine(
+            headless=self.headless,
+            max_steps=self.max_steps,
+            use_auth=self.use_auth,
+            use_session=self.use_session,
+            credentials_path=self.credentials_path,
+            pool=pool,
+            use_skills=self.use_skills
+        )
+
 
 class WorkflowEngine:
     """
@@ -688,16 +906,24 @@ class WorkflowEngine:
     - LLM decision making (Phase 3)
     """
 
-    def __init__(self, headless: bool = False, max_steps: int = 20):
+    def __init__(
+        self,
+        headless: bool = False,
+        max_steps: int = 20,
+        browser_cls: Callable[..., BrowserAgent] = BrowserAgent
+    ):
         """
         Initialize workflow engine
 
         Args:
             headless: Run browser in headless mode
             max_steps: Maximum actions before stopping (safety)
+            browser_cls: Browser agent class (or factory) to run each
+                workflow in, called with headless=...
         """
         self.headless = headless
         self.max_steps = max_steps
+        self.browser_cls = browser_cls
         self.llm_agent = LLMAgent()
 
     def execute_workflow(self, query: str) -> Dict[str, Any]:
@@ -710,22 +936,22 @@ class WorkflowEngine:
         Returns:
             Dictionary with workflow results
         """
-        print("\n" + "="*80)
-        print(f"🚀 EXECUTING WORKFLOW: {query}")
-        print("="*80 + "\n")
+        log.info("\n" + "="*80)
+        log.info(f"🚀 EXECUTING WORKFLOW: {query}")
+        log.info("="*80 + "\n")
 
         # Parse the query
         parsed = self.llm_agent.parse_query(query)
         app = parsed['app']
         task = parsed['task']
 
-        print(f"📋 Task: {task}")
-        print(f"🎯 App: {app}")
+        log.info(f"📋 Task: {task}")
+        log.info(f"🎯 App: {app}")
 
         # Get app URL
         app_url = APP_URLS.get(app.lower())
         if not app_url:
-            print(f"⚠️  Unknown app: {app}, using generic approach")
+            log.warning(f"⚠️  Unknown app: {app}, using generic approach")
             # Try common URL patterns
             if app.lower() == "other":
                 app_url = "https://example.com"  # Safe fallback
@@ -734,7 +960,7 @@ class WorkflowEngine:
 
         # Create task directory for screenshots
         task_dir = self._create_task_directory(app, task)
-        print(f"📁 Saving to: {task_dir}")
+        log.info(f"📁 Saving to: {task_dir}")
 
         # Execute workflow
         workflow_result = self._run_workflow_loop(
@@ -744,12 +970,12 @@ class WorkflowEngine:
             task_dir=task_dir
         )
 
-        print("\n" + "="*80)
-        print(f"✅ WORKFLOW COMPLETE")
-        print(f"   Steps taken: {workflow_result['step_count']}")
-        print(f"   Screenshots: {workflow_result['screenshot_count']}")
-        print(f"   Status: {workflow_result['status']}")
-        print("="*80 + "\n")
+        log.info("\n" + "="*80)
+        log.info(f"✅ WORKFLOW COMPLETE")
+        log.info(f"   Steps taken: {workflow_result['step_count']}")
+        log.info(f"   Screenshots: {workflow_result['screenshot_count']}")
+        log.info(f"   Status: {workflow_result['status']}")
+        log.info("="*80 + "\n")
 
         return workflow_result
 
@@ -776,9 +1002,9 @@ class WorkflowEngine:
         actions_taken = []
         step_count = 0
 
-        with BrowserAgent(headless=self.headless) as browser:
+        with self.browser_cls(headless=self.headless) as browser:
             # Step 0: Navigate to app
-            print(f"\n📍 Step 0: Navigating to {app_url}")
+            log.info(f"\n📍 Step 0: Navigating to {app_url}")
             browser.goto(app_url)
             browser.wait(2000)  # Wait for initial load
 
@@ -789,20 +1015,20 @@ class WorkflowEngine:
             while step_count < self.max_steps:
                 step_count += 1
 
-                print(f"\n{'─'*80}")
-                print(f"🔄 Step {step_count}/{self.max_steps}")
-                print(f"{'─'*80}")
+                log.info(f"\n{'─'*80}")
+                log.info(f"🔄 Step {step_count}/{self.max_steps}")
+                log.info(f"{'─'*80}")
 
                 # 1. OBSERVE: Capture current state
                 state_info = detector.get_current_state_info()
                 state_info['app'] = app
                 state_info['step'] = step_count
 
-                print(f"👁️  Observing state:")
-                print(f"   - URL: {state_info['url'][:50]}...")
-                print(f"   - Title: {state_info['title'][:50]}...")
-                print(f"   - Modal: {state_info['has_modal']}")
-                print(f"   - Dropdown: {state_info['has_dropdown']}")
+                log.info(f"👁️  Observing state:")
+                log.info(f"   - URL: {state_info['url'][:50]}...")
+                log.info(f"   - Title: {state_info['title'][:50]}...")
+                log.info(f"   - Modal: {state_info['has_modal']}")
+                log.info(f"   - Dropdown: {state_info['has_dropdown']}")
 
                 # 2. CAPTURE: Take screenshot
                 screenshot_name = f"{step_count:02d}_state"
@@ -816,22 +1042,22 @@ class WorkflowEngine:
                 save_metadata(screenshot_path, state_info, task=task)
 
                 # 3. DECIDE: Ask LLM what to do next
-                print(f"🤔 Asking LLM for decision...")
+                log.info(f"🤔 Asking LLM for decision...")
                 action = self.llm_agent.decide_action(
                     task=task,
-                    screenshot_path=screenshot_path,
+                    screenshot_path=browser.last_screenshot,
                     state_info=state_info,
                     is_initial=(step_count == 1)
                 )
 
-                print(f"💡 Decision: {action['action']}")
-                print(f"   Reasoning: {action.get('reasoning', 'N/A')[:100]}...")
+                log.info(f"💡 Decision: {action['action']}")
+                log.info(f"   Reasoning: {action.get('reasoning', 'N/A')[:100]}...")
 
                 actions_taken.append(action)
 
                 # 4. CHECK: Are we done?
                 if action['action'] == 'done':
-                    print(f"✅ Task completed!")
+                    log.info(f"✅ Task completed!")
                     return {
                         'status': 'completed',
                         'step_count': step_count,
@@ -842,21 +1068,21 @@ class WorkflowEngine:
                     }
 
                 # 5. ACT: Execute the action
-                print(f"⚡ Executing action...")
+                log.info(f"⚡ Executing action...")
                 success = browser.execute_action(action)
 
                 if not success:
-                    print(f"⚠️  Action failed, but continuing...")
+                    log.warning(f"⚠️  Action failed, but continuing...")
 
                 # Wait for state to settle
                 browser.wait(2000)
 
                 # Check if state changed significantly
                 if detector.has_significant_change():
-                    print(f"🔍 Significant state change detected!")
+                    log.info(f"🔍 Significant state change detected!")
 
             # Hit max steps
-            print(f"\n⚠️  Reached maximum steps ({self.max_steps})")
+            log.warning(f"\n⚠️  Reached maximum steps ({self.max_steps})")
             return {
                 'status': 'max_steps_reached',
                 'step_count': step_count,
@@ -903,15 +1129,15 @@ class WorkflowEngine:
         results = []
 
         for i, query in enumerate(queries, 1):
-            print(f"\n{'='*80}")
-            print(f"BATCH EXECUTION: {i}/{len(queries)}")
-            print(f"{'='*80}")
+            log.info(f"\n{'='*80}")
+            log.info(f"BATCH EXECUTION: {i}/{len(queries)}")
+            log.info(f"{'='*80}")
 
             try:
                 result = self.execute_workflow(query)
                 results.append(result)
             except Exception as e:
-                print(f"❌ Workflow failed: {e}")
+                log.error(f"❌ Workflow failed: {e}")
                 results.append({
                     'status': 'failed',
                     'error': str(e),
@@ -920,7 +1146,7 @@ class WorkflowEngine:
 
             # Brief pause between workflows
             if i < len(queries):
-                print(f"\n⏸️  Pausing 5 seconds before next workflow...")
+                log.info(f"\n⏸️  Pausing 5 seconds before next workflow...")
                 time.sleep(5)
 
         return results
\ No newline at end of file
@@ -0,0 +1,67 @@
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.llm_agent import LLMAgent
+
+
+def _normalize(decision):
+    """Run _normalize_batch without building a real (API-backed) agent"""
+    return LLMAgent._normalize_batch(LLMAgent.__new__(LLMAgent), decision)
+
+
+def test_batch_of_several_steps():
+    """Several actions become one 'batch' action, in order"""
+    action = _normalize({
+        "actions": [
+            {"action": "fill", "element_id": 3, "text": "Roadmap", "description": "Name the project"},
+            {"action": "click", "element_id": 7, "description": "Click Create"},
+        ],
+        "reasoning": "Form is open",
+    })
+    assert action["action"] == "batch"
+    assert [step["element_id"] for step in action["actions"]] == [3, 7]
+    assert action["description"] == "Name the project; Click Create"
+    assert action["reasoning"] == "Form is open"
+
+
+def test_single_step_collapses():
+    """One remaining step is returned as a plain action, keeping top-level fields"""
+    action = _normalize({
+        "actions": [
+            {"action": "click", "element_id": 5, "description": "Open menu"},
+            {"action": "done"},
+        ],
+        "reasoning": "Menu is the goal",
+    })
+    assert action["action"] == "click"
+    assert action["element_id"] == 5
+    assert action["reasoning"] == "Menu is the goal"
+    assert "actions" not in action
+
+
+def test_only_done_becomes_done():
+    """A batch that only declares completion is a 'done' action"""
+    action = _normalize({"actions": [{"action": "done"}]})
+    assert action["action"] == "done"
+
+
+def test_empty_or_invalid_becomes_wait():
+    """No usable steps at all falls back to a wait"""
+    for actions in ([], ["click 5"], [{"description": "no action key"}]):
+        action = _normalize({"actions": actions})
+        assert action["action"] == "wait"
+        assert action["milliseconds"] == 2000
+
+
+if __name__ == "__main__":
+    print("\n🧪 BATCH ACTION TESTS\n")
+
+    test_batch_of_several_steps()
+    test_single_step_collapses()
+    test_only_done_becomes_done()
+    test_empty_or_invalid_becomes_wait()
+
+    print("✅ All batch action tests passed!")
@@ -0,0 +1,74 @@
+import string
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.prompts import (
+    _compile_template,
+    TASK_PROMPT,
+    ACTION_DECISION_PROMPT,
+    TEXT_DECISION_PROMPT,
+    render_task,
+    render_action_decision,
+    render_text_decision,
+)
+
+
+def _fields(template):
+    """Distinct sample value for every {field} in a template"""
+    names = {name for _, name, _, _ in string.Formatter().parse(template) if name is not None}
+    return {name: f"<{name} value>" for name in names}
+
+
+def test_matches_str_format():
+    """Compiled renderers give exactly what str.format gives"""
+    for template, render in (
+        (TASK_PROMPT, render_task),
+        (ACTION_DECISION_PROMPT, render_action_decision),
+        (TEXT_DECISION_PROMPT, render_text_decision),
+    ):
+        fields = _fields(template)
+        assert render(**fields) == template.format(**fields)
+
+
+def test_escaped_braces():
+    """Doubled braces (the JSON examples in the prompts) render as single braces"""
+    template = 'Reply with {{"action": "{action}", "ids": [{{"id": {n}}}]}} now {{}}'
+    render = _compile_template(template)
+    assert render(action="click", n=3) == template.format(action="click", n=3)
+    assert render(action="click", n=3) == 'Reply with {"action": "click", "ids": [{"id": 3}]} now {}'
+
+
+def test_repeated_and_non_string_fields():
+    """Fields may repeat and are str()-converted like format()"""
+    render = _compile_template("{a}-{b}-{a}")
+    assert render(a=1, b=None) == "1-None-1"
+
+
+def test_field_values_not_reparsed():
+    """Braces inside field values are inserted verbatim"""
+    render = _compile_template("Task: {task}")
+    assert render(task="{not a field}") == "Task: {not a field}"
+
+
+def test_missing_field_raises():
+    """A missing field fails loudly, as format() does"""
+    try:
+        _compile_template("{a} {b}")(a=1)
+    except KeyError:
+        return
+    raise AssertionError("missing field was not reported")
+
+
+if __name__ == "__main__":
+    print("\n🧪 PROMPT TEMPLATE TESTS\n")
+
+    test_matches_str_format()
+    test_escaped_braces()
+    test_repeated_and_non_string_fields()
+    test_field_values_not_reparsed()
+    test_missing_field_raises()
+
+    print("✅ All prompt template tests passed!")
@@ -0,0 +1,82 @@
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.skill_cache import SkillCache, skill_key, skill_step
+
+
+MAPPING = {
+    4: {'text': 'Create', 'ariaLabel': 'Create project', 'role': 'button',
+        'selector': 'button.create', 'position': {'x': 10, 'y': 20}},
+}
+
+
+def test_skill_key_normalization():
+    """Case and whitespace in the task don't change the key; the app does"""
+    key = skill_key('asana', 'Create a project')
+    assert skill_key('asana', '  create   A\tPROJECT ') == key
+    assert skill_key('linear', 'Create a project') != key
+    assert skill_key('asana', 'Create a task') != key
+
+
+def test_skill_step_stores_element_not_id():
+    """Clicks/fills keep the element's locator fields instead of its SoM id"""
+    step = skill_step({'action': 'click', 'element_id': 4, 'description': 'Click Create',
+                       'reasoning': 'not replayed'}, MAPPING)
+    assert step == {
+        'action': 'click',
+        'description': 'Click Create',
+        'element': {'text': 'Create', 'ariaLabel': 'Create project',
+                    'role': 'button', 'selector': 'button.create'},
+    }
+
+
+def test_skill_step_without_element():
+    """Element-less clicks/fills can't be replayed; key presses can"""
+    assert skill_step({'action': 'click', 'element_id': 9}, MAPPING) is None
+    assert skill_step({'action': 'fill', 'text': 'Roadmap'}) is None
+    assert skill_step({'action': 'press_key', 'key': 'Enter'}) == {'action': 'press_key', 'key': 'Enter'}
+    assert skill_step({'action': 'wait', 'milliseconds': 1000}) is None
+
+
+def test_save_load_invalidate_round_trip():
+    """Saved steps load back unchanged, leave no temp files and can be dropped"""
+    steps = [
+        skill_step({'action': 'fill', 'element_id': 4, 'text': 'Roadmap'}, MAPPING),
+        skill_step({'action': 'press_key', 'key': 'Enter'}),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        skills_dir = Path(tmp) / "skills"
+        cache = SkillCache(skills_dir)
+        assert cache.load('asana', 'Create a project') is None
+
+        cache.save('asana', 'Create a project', steps)
+        assert cache.load('asana', 'create a  project') == steps
+        assert [p.name for p in skills_dir.iterdir()] == [f"{skill_key('asana', 'Create a project')}.json"]
+
+        cache.invalidate('asana', 'Create a project')
+        assert cache.load('asana', 'Create a project') is None
+        cache.invalidate('asana', 'Create a project')  # Already gone - no error
+
+
+def test_save_skips_empty_runs():
+    """A run with no replayable steps writes nothing"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = SkillCache(Path(tmp) / "skills")
+        cache.save('asana', 'Create a project', [])
+        assert not (Path(tmp) / "skills").exists()
+
+
+if __name__ == "__main__":
+    print("\n🧪 SKILL CACHE TESTS\n")
+
+    test_skill_key_normalization()
+    test_skill_step_stores_element_not_id()
+    test_skill_step_without_element()
+    test_save_load_invalidate_round_trip()
+    test_save_skips_empty_runs()
+
+    print("✅ All skill cache tests passed!")